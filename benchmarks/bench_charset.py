@@ -0,0 +1,67 @@
+# benchmarks/bench_charset.py
+#
+# Compares the old get_feed_entries decode path (chardet over the whole body,
+# decode to str, reparse) with the header/BOM/declaration fast path.
+#
+#   python -m benchmarks.bench_charset [--items N] [--repeat N]
+
+import argparse
+import time
+import chardet
+import feedparser
+from modules.feed_charset import resolve_charset, content_type_with_charset
+
+def build_feed(items, encoding='utf-8', declare=True):
+    declaration = f'<?xml version="1.0" encoding="{encoding}"?>' if declare else '<?xml version="1.0"?>'
+    body = ''.join(
+        f"<item><title>Entrée {i} - naïve café</title><link>https://example.com/{i}</link>"
+        f"<guid>https://example.com/{i}</guid><pubDate>Mon, 01 Jan 2024 10:00:00 GMT</pubDate>"
+        f"<description>{'Résumé of the story, with a few non-ASCII characters. ' * 8}</description></item>"
+        for i in range(items)
+    )
+    return f'{declaration}<rss version="2.0"><channel><title>Bench</title>{body}</channel></rss>'.encode(encoding)
+
+def old_path(content, content_type):
+    encoding = chardet.detect(content)['encoding']
+    return feedparser.parse(content.decode(encoding))
+
+def new_path(content, content_type):
+    encoding, _ = resolve_charset(content_type, content)
+    return feedparser.parse(content, response_headers={'content-type': content_type_with_charset(content_type, encoding)})
+
+def old_detect(content, content_type):
+    return content.decode(chardet.detect(content)['encoding'])
+
+def new_detect(content, content_type):
+    return resolve_charset(content_type, content)
+
+def timed(func, content, content_type, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(content, content_type)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Charset detection benchmark")
+    parser.add_argument('--items', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    cases = [
+        ('header charset', build_feed(args.items), 'application/rss+xml; charset=utf-8'),
+        ('xml declaration', build_feed(args.items, 'iso-8859-1'), 'text/xml'),
+        ('undeclared', build_feed(args.items, declare=False), 'application/xml'),
+    ]
+    for name, content, content_type in cases:
+        size_mb = len(content) / 1e6
+        detect_old = timed(old_detect, content, content_type, args.repeat)
+        detect_new = timed(new_detect, content, content_type, args.repeat)
+        parse_old = timed(old_path, content, content_type, args.repeat)
+        parse_new = timed(new_path, content, content_type, args.repeat)
+        print(f"{name:16s} {size_mb:6.2f} MB  detect: {detect_old * 1000:8.1f} ms -> {detect_new * 1000:8.1f} ms"
+              f"  detect+parse: {parse_old * 1000:8.1f} ms -> {parse_new * 1000:8.1f} ms")
+
+if __name__ == '__main__':
+    main()
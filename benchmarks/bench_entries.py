@@ -0,0 +1,66 @@
+# benchmarks/bench_entries.py
+#
+# Memory held by cached entries: feedparser's FeedParserDict versus the
+# slotted FeedEntry the reader now caches, measured with tracemalloc and
+# projected to a million entries.
+#
+#   python -m benchmarks.bench_entries [--items N] [--summary-chars N]
+
+import argparse
+import gc
+import time
+import tracemalloc
+import feedparser
+from modules.entry_sorting import normalize_entries
+from modules.feed_entry import to_feed_entries
+
+BATCH = 1000
+
+def build_feed(start, items, summary_chars):
+    summary = ('Summary text for a story. ' * (summary_chars // 26 + 1))[:summary_chars]
+    body = ''.join(
+        f"<item><title>Story {i}: something happened</title><link>https://example.com/story/{i}</link>"
+        f"<guid>https://example.com/story/{i}</guid><pubDate>Mon, 01 Jan 2024 10:{i % 60:02d}:00 GMT</pubDate>"
+        f"<description>{summary} {i}</description></item>"
+        for i in range(start, start + items)
+    )
+    return f'<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel><title>Bench</title>{body}</channel></rss>'.encode('utf-8')
+
+def parsed_entries(items, summary_chars):
+    for start in range(0, items, BATCH):
+        feed = feedparser.parse(build_feed(start, min(BATCH, items - start), summary_chars))
+        yield normalize_entries(feed.entries)
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    held = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return held, current, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Cached entry memory benchmark")
+    parser.add_argument('--items', type=int, default=20000)
+    parser.add_argument('--summary-chars', type=int, default=200)
+    args = parser.parse_args()
+
+    def keep_parsed():
+        return [entry for batch in parsed_entries(args.items, args.summary_chars) for entry in batch]
+
+    def keep_slotted():
+        return [entry for batch in parsed_entries(args.items, args.summary_chars)
+                for entry in to_feed_entries(batch, 'https://example.com/feed.xml')]
+
+    for name, build in (('FeedParserDict', keep_parsed), ('FeedEntry', keep_slotted)):
+        held, current, elapsed = measure(build)
+        per_entry = current / len(held)
+        print(f"{name:15s} {len(held):8d} entries  {current / 1e6:8.1f} MB  {per_entry:7.0f} B/entry"
+              f"  ~{per_entry * 1e6 / 1e9:5.2f} GB per million  (built in {elapsed:.1f} s)")
+        del held
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+# benchmarks/bench_startup.py
+#
+# Cold-start cost as the stored archive grows. Each measurement runs in a
+# fresh interpreter against a generated feed store:
+#
+#   reader  - open the store and load subscriptions (what startup does now)
+#   eager   - the same plus every feed's stored entries (the old loaded_entries)
+#   window  - time until the main window has been shown and the event loop
+#             has run once (offscreen Qt; skipped if PySide6 is missing)
+#
+#   python -m benchmarks.bench_startup [--feeds N] [--entries N N ...]
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from modules.feed_store import FeedStore
+from modules.rss_feed_reader import RSSFeed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+READER = """
+import sys, time
+started = time.perf_counter()
+from modules.feed_store import FeedStore
+from modules.rss_feed_reader import RSSFeedReader
+reader = RSSFeedReader(store=FeedStore(sys.argv[1]))
+reader.load_feeds()
+if sys.argv[2] == 'eager':
+    loaded = {feed.url: reader.get_stored_entries(feed.url) for feed in reader.feeds}
+print(time.perf_counter() - started)
+"""
+
+WINDOW = """
+import sys, time
+started = time.perf_counter()
+from PySide6 import QtWidgets as qtw, QtCore as qtc
+app = qtw.QApplication([])
+from modules.RSSFeedReaderUI import RSSFeedReaderUI
+window = RSSFeedReaderUI(store_path=sys.argv[1])
+window.show()
+def shown():
+    print(time.perf_counter() - started)
+    window.close()
+    app.quit()
+qtc.QTimer.singleShot(0, shown)
+app.exec()
+"""
+
+def build_store(path, feeds, entries):
+    store = FeedStore(path)
+    store.save_feeds([RSSFeed(f"https://feeds{i % 97}.example.com/{i}.xml", f"Category {i % 20}") for i in range(feeds)])
+    per_feed = max(entries // feeds, 1)
+    summary = 'Stored summary text for a benchmark entry. ' * 5
+    for i in range(feeds):
+        feed_url = f"https://feeds{i % 97}.example.com/{i}.xml"
+        store.upsert_entries(feed_url, [
+            {'id': f"{feed_url}#{n}", 'title': f"Entry {n}", 'link': f"{feed_url}#{n}",
+             'published': '', 'published_epoch': 1700000000.0 + n * 60, 'summary': summary}
+            for n in range(per_feed)
+        ])
+    store.close()
+
+def run(script, *args):
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen', PYTHONPATH=ROOT)
+    result = subprocess.run([sys.executable, '-c', script, *args], cwd=ROOT, env=env,
+                            capture_output=True, text=True, timeout=600)
+    lines = result.stdout.strip().splitlines()
+    return float(lines[-1]) if result.returncode == 0 and lines else None
+
+def has_qt():
+    try:
+        import PySide6
+        return True
+    except ImportError:
+        return False
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start benchmark")
+    parser.add_argument('--feeds', type=int, default=200)
+    parser.add_argument('--entries', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    window = has_qt()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for entries in args.entries:
+            path = os.path.join(directory, f"feeds-{entries}.db")
+            build_store(path, args.feeds, entries)
+            timings = {}
+            for name, script, mode in (('reader', READER, 'lazy'), ('eager', READER, 'eager'), ('window', WINDOW, '')):
+                if script is WINDOW and not window:
+                    continue
+                runs = [run(script, path, mode) for _ in range(args.repeat)]
+                runs = [value for value in runs if value is not None]
+                timings[name] = min(runs) if runs else None
+            size_mb = os.path.getsize(path) / 1e6
+            print(f"{entries:8d} entries ({size_mb:6.1f} MB)  " + "  ".join(
+                f"{name}: {value * 1000:7.1f} ms" if value is not None else f"{name}: failed"
+                for name, value in timings.items()))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+# benchmarks/fixtures.py
+#
+# Generated RSS/Atom fixtures and a local HTTP stand-in that serves them, so
+# fetch benchmarks never depend on the network.
+#
+#   /rss/<items>?encoding=utf-8&summary=200   RSS 2.0
+#   /atom/<items>?encoding=utf-8&summary=200  Atom 1.0
+#
+# Responses carry an ETag and answer If-None-Match with 304, like a real feed host.
+
+import hashlib
+import http.server
+import random
+import sys
+import threading
+from urllib.parse import urlsplit, parse_qs
+from xml.sax.saxutils import escape
+
+WORDS = ('market', 'update', 'report', 'release', 'storm', 'election', 'science', 'café', 'naïve',
+         'résumé', 'football', 'museum', 'budget', 'launch', 'study', 'council', 'energy', 'review')
+
+def _words(rng, count):
+    return ' '.join(rng.choice(WORDS) for _ in range(count))
+
+def _summary(rng, chars):
+    text = _words(rng, chars // 6 + 1)
+    return text[:chars]
+
+def generate_rss(items, encoding='utf-8', summary_chars=200, seed=0):
+    rng = random.Random(seed)
+    body = ''.join(
+        f"<item><title>{escape(_words(rng, 6))} {i}</title><link>https://example.com/story/{i}</link>"
+        f"<guid>https://example.com/story/{i}</guid>"
+        f"<pubDate>{['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'][i % 7]}, {1 + i % 28:02d} Jan 2024 {i % 24:02d}:{i % 60:02d}:00 GMT</pubDate>"
+        f"<description>{escape(_summary(rng, summary_chars))}</description></item>"
+        for i in range(items)
+    )
+    document = (f'<?xml version="1.0" encoding="{encoding}"?><rss version="2.0"><channel>'
+                f'<title>Fixture {items}</title><ttl>30</ttl>{body}</channel></rss>')
+    return document.encode(encoding, errors='xmlcharrefreplace')
+
+def generate_atom(items, encoding='utf-8', summary_chars=200, seed=0):
+    rng = random.Random(seed)
+    body = ''.join(
+        f'<entry><title>{escape(_words(rng, 6))} {i}</title><link rel="alternate" href="https://example.com/atom/{i}"/>'
+        f"<id>urn:fixture:{i}</id><updated>2024-01-{1 + i % 28:02d}T{i % 24:02d}:{i % 60:02d}:00Z</updated>"
+        f"<summary>{escape(_summary(rng, summary_chars))}</summary></entry>"
+        for i in range(items)
+    )
+    document = (f'<?xml version="1.0" encoding="{encoding}"?><feed xmlns="http://www.w3.org/2005/Atom">'
+                f'<title>Fixture {items}</title><updated>2024-01-01T00:00:00Z</updated>{body}</feed>')
+    return document.encode(encoding, errors='xmlcharrefreplace')
+
+GENERATORS = {
+    'rss': (generate_rss, 'application/rss+xml'),
+    'atom': (generate_atom, 'application/atom+xml'),
+}
+
+class FixtureHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    cache = {}
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        segments = parts.path.strip('/').split('/')
+        query = parse_qs(parts.query)
+        if len(segments) != 2 or segments[0] not in GENERATORS or not segments[1].isdigit():
+            self.send_error(404)
+            return
+        encoding = query.get('encoding', ['utf-8'])[0]
+        summary_chars = int(query.get('summary', ['200'])[0])
+        key = (segments[0], int(segments[1]), encoding, summary_chars)
+        if key not in self.cache:
+            generate, content_type = GENERATORS[segments[0]]
+            body = generate(int(segments[1]), encoding, summary_chars)
+            self.cache[key] = (body, f"{content_type}; charset={encoding}", f'"{hashlib.sha1(body).hexdigest()}"')
+        body, content_type, etag = self.cache[key]
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+class _QuietServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Readers that stop streaming early close the connection mid-body.
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+class FixtureServer:
+    def __init__(self, host='127.0.0.1', port=0):
+        self.server = _QuietServer((host, port), FixtureHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, kind, items, encoding='utf-8', summary_chars=200):
+        return f"{self.base_url}/{kind}/{items}?encoding={encoding}&summary={summary_chars}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,274 @@
+# benchmarks/suite.py
+#
+# Reproducible hot-path benchmarks against the local fixture server, written
+# as JSON so runs can be diffed:
+#
+#   python -m benchmarks.suite [--quick] [--only NAME ...] [--output results.json]
+#   python -m benchmarks.suite --compare baseline.json [--threshold 1.25]
+#
+# Every case reports min/median/mean seconds over --repeat runs; --compare
+# exits non-zero when a case's min time regressed past the threshold.
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from benchmarks.fixtures import FixtureServer
+from benchmarks.bench_charset import build_feed, new_detect
+from modules.logging.logger import set_logging_level
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def quiet_logging():
+    # Per-entry INFO logging would dominate the timings being measured.
+    set_logging_level(logging.WARNING)
+    for existing in list(logging.Logger.manager.loggerDict.values()):
+        if isinstance(existing, logging.Logger):
+            existing.setLevel(logging.WARNING)
+
+def measure(func, repeat, setup=None):
+    timings = []
+    for _ in range(repeat):
+        argument = setup() if setup else None
+        started = time.perf_counter()
+        func(argument) if setup else func()
+        timings.append(time.perf_counter() - started)
+    return {
+        'min_s': min(timings),
+        'median_s': statistics.median(timings),
+        'mean_s': statistics.fmean(timings),
+        'repeat': repeat,
+    }
+
+class Suite:
+    def __init__(self, server, sizes, repeat, only=None):
+        self.server = server
+        self.sizes = sizes
+        self.repeat = repeat
+        self.only = only
+        self.results = []
+
+    def wanted(self, name):
+        return not self.only or any(name.startswith(prefix) for prefix in self.only)
+
+    def record(self, name, params, stats, **extra):
+        result = {'name': name, 'params': params, **stats, **extra}
+        self.results.append(result)
+        print(f"{name:24s} {json.dumps(params):48s} min {stats['min_s'] * 1000:9.2f} ms", file=sys.stderr)
+
+    def reader(self, **kwargs):
+        from modules.rss_feed_reader import RSSFeedReader
+        return RSSFeedReader(**kwargs)
+
+    def fixture_entries(self, items):
+        reader = self.reader()
+        return reader.get_feed_entries(self.server.url('rss', items), force_refresh=True)
+
+    def run_fetch(self):
+        if not self.wanted('fetch'):
+            return
+        feeds = [('rss', 'utf-8'), ('rss', 'iso-8859-1'), ('atom', 'utf-8')]
+        for kind, encoding in feeds:
+            for items in self.sizes:
+                url = self.server.url(kind, items, encoding)
+                params = {'kind': kind, 'items': items, 'encoding': encoding}
+                reader = self.reader()
+                stats = measure(lambda: reader.entry_cache.invalidate() or reader.get_feed_entries(url, force_refresh=True),
+                                self.repeat)
+                self.record('fetch.full', params, stats)
+
+                limited = self.reader()
+                limited.set_entries_per_feed(10)
+                stats = measure(lambda: limited.entry_cache.invalidate() or limited.get_feed_entries(url, force_refresh=True),
+                                self.repeat)
+                self.record('fetch.limited', dict(params, entries_per_feed=10), stats)
+
+                cached = self.reader()
+                cached.add_feed(url)
+                cached.get_feed_entries(url, force_refresh=True)
+                stats = measure(lambda: cached.get_feed_entries(url, force_refresh=True), self.repeat)
+                self.record('fetch.not_modified', params, stats)
+
+    def run_parse(self):
+        if not self.wanted('parse'):
+            return
+        reader = self.reader()
+        for kind in ('rss', 'atom'):
+            for items in self.sizes:
+                url = self.server.url(kind, items)
+                self.record('parse.parse_feed', {'kind': kind, 'items': items},
+                            measure(lambda: reader.parse_feed(url), self.repeat))
+
+    def run_charset(self):
+        if not self.wanted('charset'):
+            return
+        for items in self.sizes:
+            content = build_feed(items, 'iso-8859-1')
+            self.record('charset.resolve', {'items': items, 'bytes': len(content)},
+                        measure(lambda: new_detect(content, 'text/xml'), self.repeat))
+
+    def run_sort(self):
+        if not self.wanted('sort'):
+            return
+        reader = self.reader()
+        for items in self.sizes:
+            entries = self.fixture_entries(items)
+            for method in ('date', 'title'):
+                sorting = {'method': method, 'order': 'descending'}
+                self.record('sort.sort_entries', {'items': items, 'method': method},
+                            measure(lambda copy: reader.sort_entries(copy, sorting), self.repeat,
+                                    setup=lambda: list(entries)))
+
+    def run_details(self):
+        if not self.wanted('details'):
+            return
+        reader = self.reader()
+        for items in self.sizes:
+            entries = self.fixture_entries(items)
+            self.record('details.get_entry_details', {'items': items},
+                        measure(lambda: [reader.get_entry_details(entry) for entry in entries], self.repeat))
+
+    def run_persistence(self):
+        if not self.wanted('persist'):
+            return
+        from modules.feed_store import FeedStore
+        for feeds in (1000, 10000):
+            with tempfile.TemporaryDirectory() as directory:
+                store = FeedStore(os.path.join(directory, 'bench.db'))
+                reader = self.reader(store=store)
+                reader.add_feeds((f"https://host{i % 50}.example.com/{i}.xml", f"Category {i % 10}") for i in range(feeds))
+                self.record('persist.save_feeds', {'feeds': feeds}, measure(reader.save_feeds, self.repeat))
+
+                def load():
+                    fresh = self.reader(store=store)
+                    fresh.load_feeds()
+                self.record('persist.load_feeds', {'feeds': feeds}, measure(load, self.repeat))
+
+                entries = self.fixture_entries(max(self.sizes))
+                feed_url = reader.feeds.get_feeds()[0].url
+                self.record('persist.upsert_entries', {'items': len(entries)},
+                            measure(lambda: store.upsert_entries(feed_url, entries), self.repeat))
+                self.record('persist.get_stored_entries', {'items': len(entries)},
+                            measure(lambda: reader.get_stored_entries(feed_url), self.repeat))
+                store.close()
+
+    def run_qt(self):
+        if not self.wanted('qt'):
+            return
+        # Qt runs in its own interpreter so the other cases never load it.
+        for items in (self.sizes[-1], self.sizes[-1] * 10):
+            command = [sys.executable, '-m', 'benchmarks.suite', '--qt-child', str(items), '--repeat', str(self.repeat)]
+            env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+            child = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True, timeout=600)
+            if child.returncode != 0 or not child.stdout.strip():
+                print(f"qt.list_population skipped: {child.stderr.strip().splitlines()[-1:] or child.returncode}", file=sys.stderr)
+                return
+            self.record('qt.list_population', {'items': items}, json.loads(child.stdout.strip().splitlines()[-1]))
+
+    def run(self):
+        for case in (self.run_fetch, self.run_parse, self.run_charset, self.run_sort,
+                     self.run_details, self.run_persistence, self.run_qt):
+            case()
+        return self.results
+
+def qt_child(items, repeat):
+    from PySide6 import QtWidgets as qtw, QtCore as qtc
+    from modules.entry_list_model import EntryListModel
+    from modules.feed_entry import FeedEntry
+    quiet_logging()
+    app = qtw.QApplication([])
+    entries = [FeedEntry(id=str(i), title=f"Entry {i}", link=f"https://example.com/{i}") for i in range(items)]
+    view = qtw.QListView()
+    view.setUniformItemSizes(True)
+    model = EntryListModel(view)
+    view.setModel(model)
+    view.resize(600, 700)
+    view.show()
+    output = {}
+
+    def populate():
+        model.set_entries(list(entries))
+        view.doItemsLayout()
+
+    def run():
+        output.update(measure(populate, repeat))
+        app.quit()
+
+    qtc.QTimer.singleShot(0, run)
+    app.exec()
+    print(json.dumps(output))
+
+def metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'git_commit': commit or None,
+    }
+
+def result_key(result):
+    return result['name'], json.dumps(result['params'], sort_keys=True)
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path, 'r') as file:
+        baseline = {result_key(result): result for result in json.load(file)['results']}
+    regressions = []
+    for result in results:
+        previous = baseline.get(result_key(result))
+        if not previous or not previous['min_s']:
+            continue
+        ratio = result['min_s'] / previous['min_s']
+        result['baseline_min_s'] = previous['min_s']
+        result['ratio'] = ratio
+        if ratio > threshold:
+            regressions.append(result)
+    for result in regressions:
+        print(f"REGRESSION {result['name']} {json.dumps(result['params'])}: "
+              f"{result['baseline_min_s'] * 1000:.2f} ms -> {result['min_s'] * 1000:.2f} ms ({result['ratio']:.2f}x)", file=sys.stderr)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RSS reader benchmark suite")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 1000, 5000], help="entries per fixture feed")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--quick', action='store_true', help="small sizes and 2 repeats, for smoke runs")
+    parser.add_argument('--only', nargs='+', help="case name prefixes: fetch parse charset sort details persist qt")
+    parser.add_argument('--output', help="write JSON here instead of stdout")
+    parser.add_argument('--compare', help="baseline JSON from an earlier run")
+    parser.add_argument('--threshold', type=float, default=1.25, help="min-time ratio counted as a regression")
+    parser.add_argument('--qt-child', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.qt_child:
+        qt_child(args.qt_child, args.repeat)
+        return 0
+    if args.quick:
+        args.sizes, args.repeat = [50, 500], 2
+
+    quiet_logging()
+    with FixtureServer() as server:
+        results = Suite(server, sorted(args.sizes), args.repeat, args.only).run()
+    report = {'meta': dict(metadata(), sizes=args.sizes, repeat=args.repeat), 'results': results}
+    regressions = compare(results, args.compare, args.threshold) if args.compare else []
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(text + '\n')
+    else:
+        print(text)
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
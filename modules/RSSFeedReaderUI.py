@@ -1,17 +1,20 @@
 #modules/RSSFeedReaderUI.py
 
 import os
+import time
 import asyncio
 import threading
 from PySide6 import QtWidgets as qtw
 from PySide6 import QtCore as qtc
 from PySide6 import QtGui as qtg
 from PySide6.QtGui import QDesktopServices
-import json
 import configparser
-import feedparser
 import webbrowser
-from modules.rss_feed_reader import RSSFeedReader, RSSFeedReaderError
+from modules.rss_feed_reader import CancelToken, RSSFeedReader, RSSFeedReaderError
+from modules.feed_store import FeedStore
+from modules.feed_trace import RefreshProfiler, enable_from_env, span, tracer
+from modules.feed_worker import FeedWorkerSignals, FeedFetchWorker, FeedRefreshWorker
+from modules.entry_list_model import EntryListModel
 from modules.tooltip import ToolTip
 from modules.settings import settings
 from modules.settings import filter_sort_settings
@@ -20,22 +23,50 @@ from modules.logging.logger import setup_logger
 logger = setup_logger('RSSFeedReaderUI')
 
 class RSSFeedReaderUI(qtw.QMainWindow):
-    def __init__(self):
+    def __init__(self, store_path=None):
         super().__init__()
         logger.info("Initializing RSS Feed Reader...")
         self.setWindowTitle("RSS Feed Reader")
-        self.rss_feed_reader = RSSFeedReader()
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        self.rss_feed_reader = RSSFeedReader(store=FeedStore(store_path or os.path.join(script_dir, "feeds.db")))
         logger.info("Loading feeds and configuration...")
         self.load_feeds()
         self.load_config()
         settings.load_settings(self)  
+        self.rss_feed_reader.set_refresh_interval(self.refresh_interval_mins)
+        self.rss_feed_reader.set_entries_per_feed(self.entries_per_feed)
         filter_sort_settings.load_filter_sort_settings(self)
+        self.rss_feed_reader.set_filters(self.filters)
         self.url_cooldown = False
+        # RSS_TRACE / RSS_PROFILE switch these on from startup; Ctrl+Shift+T and
+        # Ctrl+Shift+P do it at runtime.
+        self.trace_path, self.refresh_profiler = enable_from_env()
+
+        self.refresh_timer = qtc.QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.timeout.connect(self.refresh_due_feeds)
+
+        # Network and parsing run on the pool; results come back through worker_signals.
+        self.thread_pool = qtc.QThreadPool(self)
+        self.worker_signals = FeedWorkerSignals(self)
+        self.worker_signals.entries_ready.connect(self.on_entries_ready)
+        self.worker_signals.failed.connect(self.on_feed_failed)
+        self.worker_signals.refreshed.connect(self.on_feeds_refreshed)
+        self.fetch_request_id = 0
+        self.fetch_worker = None
+        self.refresh_in_progress = False
+        # Shared by every refresh worker; cancelled only when the window closes.
+        self.refresh_cancel = CancelToken()
+        self.current_feed_url = None
+        self.filtered_view = None
+        self.entry_model = EntryListModel(self)
 
         width, height = 600, 700
         self.resize(width, height)
 
         self.create_widgets()
+        qtg.QShortcut(qtg.QKeySequence("Ctrl+Shift+T"), self, self.toggle_tracing)
+        qtg.QShortcut(qtg.QKeySequence("Ctrl+Shift+P"), self, self.profile_refresh)
 
     def open_url(self, url):
         logger.info("Opening url...")
@@ -101,6 +132,18 @@ class RSSFeedReaderUI(qtw.QMainWindow):
             settings_layout.addWidget(filter_sort_button)
             ToolTip.setToolTip(filter_sort_button, "Open Filter/Sort Settings")
 
+            import_opml_button = qtw.QPushButton("Import OPML", settings_frame)
+            import_opml_button.setStyleSheet(f"background-color: {self.window_bg}; color: {self.font_color}; font: {font_style}; border: none;")
+            import_opml_button.clicked.connect(self.import_opml)
+            settings_layout.addWidget(import_opml_button)
+            ToolTip.setToolTip(import_opml_button, "Import subscriptions from an OPML file")
+
+            export_opml_button = qtw.QPushButton("Export OPML", settings_frame)
+            export_opml_button.setStyleSheet(f"background-color: {self.window_bg}; color: {self.font_color}; font: {font_style}; border: none;")
+            export_opml_button.clicked.connect(self.export_opml)
+            settings_layout.addWidget(export_opml_button)
+            ToolTip.setToolTip(export_opml_button, "Export subscriptions to an OPML file")
+
             self.settings_button = qtw.QPushButton(settings_frame)
             self.settings_button.setIcon(settings_img)
             self.settings_button.setStyleSheet(f"background-color: {self.window_bg}; color: {self.font_color}; font: {font_style}; border: none;")
@@ -157,9 +200,11 @@ class RSSFeedReaderUI(qtw.QMainWindow):
             button_layout.addWidget(self.remove_feed_button)
             ToolTip.setToolTip(self.remove_feed_button, "Remove the selected RSS feed")
 
-            self.entries_listbox = qtw.QListWidget(central_widget)
+            self.entries_listbox = qtw.QListView(central_widget)
             self.entries_listbox.setStyleSheet(f"background-color: {self.window_bg}; color: {self.font_color}; font: {font_style};")
-            self.entries_listbox.itemClicked.connect(self.on_entry_click)
+            self.entries_listbox.setUniformItemSizes(True)
+            self.entries_listbox.setModel(self.entry_model)
+            self.entries_listbox.clicked.connect(self.on_entry_click)
             layout.addWidget(self.entries_listbox)
 
             entry_button_frame = qtw.QFrame(central_widget)
@@ -211,17 +256,23 @@ class RSSFeedReaderUI(qtw.QMainWindow):
     def on_feed_click(self, item):
         self.start_feed_button.setEnabled(True)
         self.remove_feed_button.setEnabled(True)
+        if self.fetch_worker and self.fetch_worker.feed_url != item.text().split(" - ")[0]:
+            self.cancel_fetch()
 
-    def on_entry_click(self, item):
+    def on_entry_click(self, index):
         self.show_entry_button.setEnabled(True)
         self.remove_entry_button.setEnabled(True)
 
+    def selected_entry(self):
+        return self.entry_model.entry(self.entries_listbox.currentIndex().row())
+
     def remove_entry(self):
-        selected_entry = self.entries_listbox.currentItem().text()
-        if selected_entry:
-            feed_url = self.feeds_listbox.currentItem().text().split(" - ")[0]
-            self.rss_feed_reader.remove_entry(feed_url, selected_entry)
-            self.entries_listbox.takeItem(self.entries_listbox.currentRow())
+        entry = self.selected_entry()
+        if entry is not None:
+            self.rss_feed_reader.remove_entry(self.current_feed_url, entry.title)
+            if self.filtered_view:
+                self.filtered_view.remove(entry)
+            self.entry_model.remove_row(self.entries_listbox.currentIndex().row())
             self.entry_details_text.clear()
             self.show_entry_button.setEnabled(False)
             self.remove_entry_button.setEnabled(False)
@@ -229,23 +280,18 @@ class RSSFeedReaderUI(qtw.QMainWindow):
             qtw.QMessageBox.critical(self, "Error", "Please select an entry to remove.")
 
     def show_entry_details(self):
-        selected_entry = self.entries_listbox.currentItem().text()
-        if selected_entry:
-            feed_url = self.feeds_listbox.currentItem().text().split(" - ")[0]
-            entries = self.rss_feed_reader.get_feed_entries(feed_url)
-            for entry in entries:
-                if entry.title == selected_entry:
-                    entry_details = self.rss_feed_reader.get_entry_details(entry)
-                    self.entry_details_text.clear()
-                    self.entry_details_text.append(f"<h3>Title: {entry_details['title']}</h3>")
-
-                    url_link = f"<a href=\"{entry_details['link']}\">{entry_details['link']}</a>"
-                    self.entry_details_text.append(f"<p><strong>Link:</strong> {url_link}</p>")
-
-                    self.entry_details_text.append(f"<p><strong>Published:</strong> {entry_details['published']}</p>")
-                    self.entry_details_text.append(f"<p><strong>Summary:</strong> {entry_details['summary']}</p>")
-
-                    break
+        entry = self.selected_entry()
+        if entry is not None:
+            with span('ui.entry_details', 'ui'):
+                entry_details = self.rss_feed_reader.get_entry_details(entry)
+                self.entry_details_text.clear()
+                self.entry_details_text.append(f"<h3>Title: {entry_details['title']}</h3>")
+
+                url_link = f"<a href=\"{entry_details['link']}\">{entry_details['link']}</a>"
+                self.entry_details_text.append(f"<p><strong>Link:</strong> {url_link}</p>")
+
+                self.entry_details_text.append(f"<p><strong>Published:</strong> {entry_details['published']}</p>")
+                self.entry_details_text.append(f"<p><strong>Summary:</strong> {entry_details['summary']}</p>")
         else:
             qtw.QMessageBox.critical(self, "Error", "Please select an entry to show details.")
 
@@ -253,17 +299,54 @@ class RSSFeedReaderUI(qtw.QMainWindow):
         QDesktopServices.openUrl(url)
 
     def start_feed(self):
-        selected_feed = self.feeds_listbox.currentItem().text()
-        if selected_feed:
-            feed_url = selected_feed.split(" - ")[0]
-            entries = self.rss_feed_reader.get_feed_entries(feed_url)
-            entries = self.rss_feed_reader.sort_entries(entries, self.sorting)
-            self.entries_listbox.clear()
-            for entry in entries:
-                self.entries_listbox.addItem(entry.title)
+        selected_feed = self.feeds_listbox.currentItem()
+        if selected_feed and selected_feed.text():
+            self.load_feed_entries(selected_feed.text().split(" - ")[0])
         else:
             qtw.QMessageBox.critical(self, "Error", "Please select a feed to start.")
 
+    def load_feed_entries(self, feed_url):
+        self.cancel_fetch()
+        self.fetch_request_id += 1
+        self.current_feed_url = feed_url
+        self.filtered_view = None
+        self.entry_model.clear()
+        self.entry_details_text.clear()
+        self.fetch_worker = FeedFetchWorker(self.worker_signals, self.fetch_request_id, self.rss_feed_reader, feed_url, self.sorting)
+        self.thread_pool.start(self.fetch_worker.run)
+
+    def cancel_fetch(self):
+        if self.fetch_worker:
+            self.fetch_worker.cancel()
+            self.fetch_worker = None
+        # Bumping the id also drops results already queued for the GUI thread.
+        self.fetch_request_id += 1
+
+    def on_entries_ready(self, request_id, feed_url, view):
+        if request_id != self.fetch_request_id:
+            return
+        self.fetch_worker = None
+        self.filtered_view = view
+        with span('ui.populate', 'ui', entries=len(view.visible)):
+            self.entry_model.set_entries(view.visible)
+
+    def apply_filters(self):
+        # Filters are re-evaluated over the entries already on screen; only a
+        # sort change needs the feed reloaded, and that is served from the cache.
+        if not self.filtered_view:
+            return
+        if self.filtered_view.sorting != self.sorting:
+            self.load_feed_entries(self.current_feed_url)
+            return
+        self.entry_details_text.clear()
+        self.entry_model.set_entries(self.filtered_view.apply(self.rss_feed_reader.entry_filter))
+
+    def on_feed_failed(self, request_id, feed_url, message):
+        if request_id != self.fetch_request_id:
+            return
+        self.fetch_worker = None
+        qtw.QMessageBox.critical(self, "Error", message)
+
     def add_feed(self):
         logger.info("Adding a new feed...")
         try:
@@ -278,7 +361,6 @@ class RSSFeedReaderUI(qtw.QMainWindow):
             self.refresh_feeds()
             self.feed_url_entry.clear()
             self.category_entry.clear()
-            self.save_feeds()
         except RSSFeedReaderError as e:
             logger.exception("Error occurred while adding feed.")
             qtw.QMessageBox.critical(self, "Error", str(e))
@@ -286,6 +368,31 @@ class RSSFeedReaderUI(qtw.QMainWindow):
             logger.exception("Unexpected error occurred while adding feed.")
             qtw.QMessageBox.critical(self, "Error", "An unexpected error occurred.")
 
+    def import_opml(self):
+        path, _ = qtw.QFileDialog.getOpenFileName(self, "Import OPML", "", "OPML files (*.opml *.xml);;All files (*)")
+        if not path:
+            return
+        logger.info("Importing feeds from OPML: %s", path)
+        try:
+            result = self.rss_feed_reader.import_opml(path)
+            self.refresh_feeds()
+            qtw.QMessageBox.information(self, "Import OPML", f"Imported {len(result.added)} feeds ({result.skipped} already subscribed or invalid).")
+        except RSSFeedReaderError as e:
+            logger.exception("Error occurred while importing OPML.")
+            qtw.QMessageBox.critical(self, "Error", str(e))
+
+    def export_opml(self):
+        path, _ = qtw.QFileDialog.getSaveFileName(self, "Export OPML", "feeds.opml", "OPML files (*.opml)")
+        if not path:
+            return
+        logger.info("Exporting feeds to OPML: %s", path)
+        try:
+            count = self.rss_feed_reader.export_opml(path)
+            qtw.QMessageBox.information(self, "Export OPML", f"Exported {count} feeds.")
+        except RSSFeedReaderError as e:
+            logger.exception("Error occurred while exporting OPML.")
+            qtw.QMessageBox.critical(self, "Error", str(e))
+
     def remove_feed(self):
         try:
             selected_feed = self.feeds_listbox.currentItem().text()
@@ -297,7 +404,6 @@ class RSSFeedReaderUI(qtw.QMainWindow):
             feed_url = selected_feed.split(" - ")[0]
 
             self.rss_feed_reader.remove_feed(feed_url)
-            self.save_feeds()
             self.refresh_feeds()
         except RSSFeedReaderError as e:
             logger.exception("Error occurred while removing feed.")
@@ -309,125 +415,107 @@ class RSSFeedReaderUI(qtw.QMainWindow):
     def refresh_feeds(self):
         logger.info("Refreshing feeds...")
         try:
+            self.cancel_fetch()
+            self.current_feed_url = None
+            self.filtered_view = None
             self.feeds_listbox.clear()
-            self.entries_listbox.clear()
+            self.entry_model.clear()
             self.entry_details_text.clear()
 
             feeds = self.rss_feed_reader.get_feeds()
             for feed in feeds:
                 self.feeds_listbox.addItem(f"{feed.url} - {feed.category}")
 
-            qtc.QTimer.singleShot(self.refresh_interval_mins * 60000, self.refresh_feeds)
+            self.schedule_next_refresh()
         except Exception as e:
             logger.exception("Error occurred while refreshing feeds.")
             qtw.QMessageBox.critical(self, "Error", "An error occurred while refreshing feeds.")
 
+    def schedule_next_refresh(self):
+        delay = self.rss_feed_reader.scheduler.next_due_in()
+        if delay is None:
+            self.refresh_timer.stop()
+            return
+        # One timer, always re-armed for the earliest due feed; QTimer takes an int of ms.
+        self.refresh_timer.start(int(min(delay, 86400) * 1000))
+
+    def refresh_due_feeds(self):
+        if self.refresh_in_progress:
+            return
+        logger.info("Refreshing due feeds...")
+        self.refresh_in_progress = True
+        self.thread_pool.start(FeedRefreshWorker(self.worker_signals, self.rss_feed_reader, profiler=self.refresh_profiler,
+                                                 cancel=self.refresh_cancel).run)
+
+    def profile_refresh(self):
+        # Refreshes every feed under cProfile, whatever is due.
+        if self.refresh_in_progress:
+            return
+        path = os.path.abspath(time.strftime("rss-refresh-%Y%m%d-%H%M%S.prof"))
+        logger.info("Profiling a full refresh into %s", path)
+        self.refresh_in_progress = True
+        self.thread_pool.start(FeedRefreshWorker(self.worker_signals, self.rss_feed_reader, full=True,
+                                                 profiler=RefreshProfiler(path), cancel=self.refresh_cancel).run)
+
+    def toggle_tracing(self):
+        if not tracer.enabled:
+            tracer.clear()
+            tracer.enable()
+            logger.info("Tracing enabled")
+            return
+        tracer.disable()
+        self.write_trace()
+
+    def write_trace(self):
+        path = self.trace_path or os.path.abspath(time.strftime("rss-trace-%Y%m%d-%H%M%S.json"))
+        try:
+            tracer.write(path)
+        except OSError as e:
+            logger.exception("Error occurred while writing trace.")
+
+    def on_feeds_refreshed(self, results):
+        self.refresh_in_progress = False
+        try:
+            if self.current_feed_url in results and results[self.current_feed_url].ok and not self.fetch_worker:
+                self.load_feed_entries(self.current_feed_url)
+        except Exception as e:
+            logger.exception("Error occurred while refreshing due feeds.")
+        finally:
+            self.schedule_next_refresh()
+
     def load_feeds(self):
         logger.info("Loading feeds...")
         try:
             script_dir = os.path.dirname(os.path.abspath(__file__))
-            config_path = os.path.join(script_dir, "feeds.json")
-
-            if os.path.exists(config_path):
-                with open(config_path, "r") as file:
-                    feed_data = json.load(file)
-                    self.loaded_entries = {}
-                    for category, data in feed_data.items():
-                        for feed in data["feeds"]:
-                            self.rss_feed_reader.add_feed(feed["url"], category)
-                            entries = data["entries"].get(feed["url"], [])
-                            self.loaded_entries[feed["url"]] = []
-                            for entry_details in entries:
-                                entry = feedparser.FeedParserDict(entry_details)
-                                self.loaded_entries[feed["url"]].append(entry)
+            self.rss_feed_reader.store.migrate_from_json(os.path.join(script_dir, "feeds.json"))
+            # Only subscriptions are read here; a feed's entries come out of the
+            # store when it is first opened or refreshed.
+            self.rss_feed_reader.load_feeds()
         except Exception as e:
             logger.exception("Error occurred while loading feeds.")
 
     def on_feed_select(self, item):
-        try:
-            selected_feed = item.text()
-
-            if not selected_feed:
-                return
-
-            feed_url = selected_feed.split(" - ")[0]
-
-            entries = self.rss_feed_reader.get_feed_entries(feed_url)
-            entries = self.rss_feed_reader.sort_entries(entries, self.sorting)
-            self.entries_listbox.clear()
-
-            for entry in entries:
-                self.entries_listbox.addItem(entry.title)
-
-            self.entries_listbox.itemClicked.connect(self.on_entry_select)
-        except RSSFeedReaderError as e:
-            logger.exception("Error occurred while selecting feed.")
-            qtw.QMessageBox.critical(self, "Error", str(e))
-        except Exception as e:
-            logger.exception("Unexpected error occurred while selecting feed.")
-            qtw.QMessageBox.critical(self, "Error", "An unexpected error occurred.")
-
-    def on_entry_select(self, item):
-        try:
-            selected_entry = item.text()
-
-            if not selected_entry:
-                return
-
-            feed_url = self.feeds_listbox.currentItem().text().split(" - ")[0]
-            entries = self.rss_feed_reader.get_feed_entries(feed_url)
-
-            for entry in entries:
-                if entry.title == selected_entry:
-                    entry_details = self.rss_feed_reader.get_entry_details(entry)
-                    self.entry_details_text.clear()
-                    self.entry_details_text.append(f"Title: {entry_details['title']}\n\n")
-                    self.entry_details_text.append(f"Link: {entry_details['link']}\n\n")
-                    self.entry_details_text.append(f"Published: {entry_details['published']}\n\n")
-                    self.entry_details_text.append(f"Summary: {entry_details['summary']}")
-                    break
-        except RSSFeedReaderError as e:
-            logger.exception("Error occurred while selecting entry.")
-            qtw.QMessageBox.critical(self, "Error", str(e))
-        except Exception as e:
-            logger.exception("Unexpected error occurred while selecting entry.")
-            qtw.QMessageBox.critical(self, "Error", "An unexpected error occurred.")
+        selected_feed = item.text()
+        if selected_feed:
+            self.load_feed_entries(selected_feed.split(" - ")[0])
 
     def save_feeds(self):
         logger.info("Saving feeds...")
         try:
-            feeds = self.rss_feed_reader.get_feeds()
-            feed_data = {}
-
-            for feed in feeds:
-                category = feed.category
-                if category not in feed_data:
-                    feed_data[category] = {"feeds": [], "entries": {}}
-
-                feed_data[category]["feeds"].append({"url": feed.url})
-
-                try:
-                    entries = self.rss_feed_reader.get_feed_entries(feed.url)
-                    feed_data[category]["entries"][feed.url] = []
-
-                    for entry in entries:
-                        try:
-                            entry_details = self.rss_feed_reader.get_entry_details(entry)
-                            feed_data[category]["entries"][feed.url].append(entry_details)
-                        except RSSFeedReaderError as e:
-                            logger.warning(f"Skipping entry due to missing details: {str(e)}")
-                except RSSFeedReaderError as e:
-                    logger.warning(f"Skipping feed due to parsing error: {str(e)}")
-                    continue
-
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            config_path = os.path.join(script_dir, "feeds.json")
-            with open(config_path, "w") as file:
-                json.dump(feed_data, file, indent=2)
+            self.rss_feed_reader.save_feeds()
         except Exception as e:
             logger.exception("Error occurred while saving feeds.")
 
     def closeEvent(self, event):
-        #self.save_feeds()
+        self.refresh_timer.stop()
+        self.cancel_fetch()
+        # Drop queued work and abort the fetches of a running refresh, then wait
+        # for the workers: a refresh still writes to the store until it returns.
+        self.refresh_cancel.cancel()
+        self.thread_pool.clear()
+        self.thread_pool.waitForDone()
+        self.save_feeds()
+        if tracer.enabled:
+            self.write_trace()
         logger.info("RSS Feed Reader closed.")
         event.accept()
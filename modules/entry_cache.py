@@ -0,0 +1,121 @@
+# modules/entry_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from modules.entry_sorting import SortedEntries
+from modules.logging.logger import setup_logger
+
+logger = setup_logger('entry_cache')
+
+# Rough per-entry cost of a FeedEntry and its string headers, on top of its text.
+ENTRY_OVERHEAD_BYTES = 400
+
+def estimate_entries_size(entries):
+    size = 0
+    for entry in entries:
+        size += ENTRY_OVERHEAD_BYTES
+        size += len(getattr(entry, 'title', '') or '')
+        size += len(getattr(entry, 'summary', '') or '')
+        size += len(getattr(entry, 'link', '') or '')
+    return size
+
+class CachedFeed:
+    __slots__ = ('entries', 'fetched_at', 'size', 'sorted')
+
+    def __init__(self, entries, fetched_at, size):
+        self.entries = entries
+        self.fetched_at = fetched_at
+        self.size = size
+        self.sorted = SortedEntries(entries)
+
+class EntryCache:
+    """Parsed entries per feed URL, expired by TTL and evicted least recently used first.
+
+    Expired feeds are kept until evicted so their entries can still be served
+    when a conditional GET comes back 304 Not Modified.
+    """
+
+    def __init__(self, ttl_secs=1800, max_entries=100000, max_bytes=256 * 1024 * 1024):
+        self.ttl_secs = ttl_secs
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_entries = 0
+        self.total_bytes = 0
+        self._feeds = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._feeds)
+
+    def __contains__(self, feed_url):
+        return feed_url in self._feeds
+
+    def get(self, feed_url):
+        with self._lock:
+            cached = self._feeds.get(feed_url)
+            if cached is None or time.monotonic() - cached.fetched_at > self.ttl_secs:
+                return None
+            self._feeds.move_to_end(feed_url)
+            return cached.entries
+
+    def get_stale(self, feed_url):
+        with self._lock:
+            cached = self._feeds.get(feed_url)
+            if cached is None:
+                return None
+            self._feeds.move_to_end(feed_url)
+            return cached.entries
+
+    def get_sorted(self, feed_url):
+        with self._lock:
+            cached = self._feeds.get(feed_url)
+            return cached.sorted if cached is not None else None
+
+    def put(self, feed_url, entries, stale=False):
+        # stale=True seeds the cache (e.g. from the store) for conditional GETs
+        # without counting as a fresh fetch.
+        with self._lock:
+            self._discard(feed_url)
+            fetched_at = float('-inf') if stale else time.monotonic()
+            cached = CachedFeed(entries, fetched_at, estimate_entries_size(entries))
+            self._feeds[feed_url] = cached
+            self.total_entries += len(entries)
+            self.total_bytes += cached.size
+            self._evict()
+
+    def touch(self, feed_url):
+        with self._lock:
+            cached = self._feeds.get(feed_url)
+            if cached is not None:
+                cached.fetched_at = time.monotonic()
+                self._feeds.move_to_end(feed_url)
+
+    def invalidate(self, feed_url=None):
+        with self._lock:
+            if feed_url is None:
+                self._feeds.clear()
+                self.total_entries = 0
+                self.total_bytes = 0
+            else:
+                self._discard(feed_url)
+
+    def remove_entry(self, feed_url, entry_title):
+        with self._lock:
+            cached = self._feeds.get(feed_url)
+            if cached is None:
+                return
+            entries = [entry for entry in cached.entries if getattr(entry, 'title', None) != entry_title]
+            self.put(feed_url, entries)
+
+    def _discard(self, feed_url):
+        cached = self._feeds.pop(feed_url, None)
+        if cached is not None:
+            self.total_entries -= len(cached.entries)
+            self.total_bytes -= cached.size
+
+    def _evict(self):
+        while len(self._feeds) > 1 and (self.total_entries > self.max_entries or self.total_bytes > self.max_bytes):
+            feed_url, _ = next(iter(self._feeds.items()))
+            self._discard(feed_url)
+            logger.debug("Evicted cached entries for RSS feed: %s", feed_url)
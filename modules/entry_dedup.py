@@ -0,0 +1,215 @@
+# modules/entry_dedup.py
+
+import array
+import hashlib
+import re
+import threading
+from functools import lru_cache
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from modules.feed_store import dedup_key, entry_guid
+from modules.logging.logger import setup_logger
+
+logger = setup_logger('entry_dedup')
+
+# MinHash over the word set of title + summary, banded for LSH: 12 bands of 3
+# rows. Two entries whose word sets overlap by Jaccard J share a band with
+# probability J**3; requiring 2 shared bands groups a one-word edit of an
+# 8-word title (J ~ 0.78) over 99% of the time and half-overlapping texts
+# (J ~ 0.33) under 10% of the time.
+MINHASH_PERMUTATIONS = 36
+LSH_BANDS = 12
+LSH_ROWS = MINHASH_PERMUTATIONS // LSH_BANDS
+MIN_SHARED_BANDS = 2
+# Fewer distinct words than this are too little to call near duplicates reliably.
+MIN_SIGNATURE_TOKENS = 4
+# Bumped whenever the stored keys change, so existing archives are re-indexed once.
+DEDUP_INDEX_VERSION = '2'
+REINDEX_BATCH = 5000
+
+TRACKING_PARAMS = frozenset(('fbclid', 'gclid', 'mc_cid', 'mc_eid', 'ref', 'ref_src', 'cmpid', 'ncid', 'ocid'))
+STOP_WORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'have', 'in', 'is', 'it',
+    'its', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'were', 'will', 'with',
+))
+
+_TAG = re.compile(r'<[^>]+>')
+_TOKEN = re.compile(r'\w+')
+
+def _hash64(text):
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+def normalize_link(link):
+    """Canonical form of an entry link: no scheme/www/fragment/tracking params, sorted query."""
+    if not link:
+        return None
+    try:
+        parts = urlsplit(link.strip())
+    except ValueError:
+        return None
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if not host:
+        return None
+    query = sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                   if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS)
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit(('', host, path, urlencode(query), ''))
+
+def link_hash(link):
+    normalized = normalize_link(link)
+    return f"{_hash64(normalized):016x}" if normalized else None
+
+@lru_cache(maxsize=65536)
+def _token_hashes(token):
+    # One 32-bit hash per permutation from a single extendable-output digest.
+    return array.array('I', hashlib.shake_128(token.encode('utf-8')).digest(MINHASH_PERMUTATIONS * 4))
+
+def minhash(text):
+    """MinHash signature of the distinct non-stop words in text, or None if there are too few."""
+    tokens = {token for token in _TOKEN.findall(_TAG.sub(' ', text or '').casefold()) if token not in STOP_WORDS}
+    if len(tokens) < MIN_SIGNATURE_TOKENS:
+        return None
+    return list(map(min, *(_token_hashes(token) for token in tokens)))
+
+def entry_signature(entry):
+    return minhash(f"{entry.get('title') or ''} {entry.get('summary') or ''}")
+
+def band_keys(signature):
+    """One SQLite key per LSH band; entries sharing a key agree on that band's rows."""
+    if signature is None:
+        return []
+    return [dedup_key(f"{band}:" + ','.join(map(str, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS])))
+            for band in range(LSH_BANDS)]
+
+def entry_key(feed_url, guid):
+    return dedup_key(f"{feed_url}\x00{guid}")
+
+class DuplicateIndex:
+    """Assigns every ingested entry a duplicate-group id shared with its copies in other feeds.
+
+    A GUID only identifies an entry within its own feed (unrelated feeds
+    happily reuse "1", "2", ...), so GUID matches are scoped per feed and
+    copies across feeds are found by normalized-link hash. Near copies are
+    found by MinHash over title and summary through LSH band keys. A group
+    takes at most one entry per feed, so one feed's templated headlines
+    ("Daily briefing for March 3: ...") stay separate stories.
+
+    All lookups are indexed queries against the feed store's dedup tables, so
+    memory use does not grow with the archive.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def _ensure_ready(self):
+        if self._ready:
+            return
+        self._ready = True
+        if self.store.get_metadata('dedup_index') == DEDUP_INDEX_VERSION:
+            return
+        # Archives grouped before the dedup tables existed: index their stored
+        # groups in batches so later entries can join them.
+        logger.info("Indexing stored entries for duplicate detection")
+        count, after_id = 0, 0
+        while True:
+            rows = self.store.get_grouped_entries(after_id, REINDEX_BATCH)
+            if not rows:
+                break
+            self.store.add_dedup_keys([self._keys(row['feed_url'], row['guid'], row['link'],
+                                                  minhash(f"{row['title'] or ''} {row['summary'] or ''}"), row['dup_group'])
+                                       for row in rows])
+            count += len(rows)
+            after_id = rows[-1]['id']
+        self.store.set_metadata('dedup_index', DEDUP_INDEX_VERSION)
+        logger.info("Indexed %s stored entries for duplicate detection", count)
+
+    @staticmethod
+    def _keys(feed_url, guid, link, signature, group):
+        normalized = normalize_link(link)
+        return (entry_key(feed_url, guid), dedup_key(feed_url or ''),
+                dedup_key(normalized) if normalized else None, group, band_keys(signature))
+
+    def _find(self, feed_url, guid, link, signature, pending):
+        """(group, is_duplicate, keys); pending holds this batch's not yet stored keys."""
+        key = entry_key(feed_url, guid)
+        if key in pending['entries']:
+            return pending['entries'][key], False, None
+        group = self.store.get_dedup_group(key)
+        if group is not None:
+            # The same entry seen again, e.g. on a re-fetch of its own feed.
+            return group, False, None
+        keys = self._keys(feed_url, guid, link, signature, None)
+        feed_key, hashed_link, bands = keys[1], keys[2], keys[4]
+        if hashed_link is not None:
+            group = (next((group for group in pending['links'].get(hashed_link, ())
+                           if not self._claimed(group, feed_key, pending)), None)
+                     or self._unclaimed(self.store.get_dedup_group_by_link(hashed_link, feed_key), feed_key, pending))
+        if group is None and bands:
+            group = (self._pending_near(bands, feed_key, pending)
+                     or self._unclaimed(self.store.find_near_dedup_group(bands, MIN_SHARED_BANDS, feed_key),
+                                        feed_key, pending))
+        is_duplicate = group is not None
+        if group is None:
+            group = f"{_hash64(f'{feed_url}:{guid}'):016x}"
+        return group, is_duplicate, keys[:3] + (group, bands)
+
+    @staticmethod
+    def _unclaimed(group, feed_key, pending):
+        # The store excludes groups it knows this feed is in; this batch's additions are not stored yet.
+        return group if group is not None and feed_key not in pending['feeds'].get(group, ()) else None
+
+    def _claimed(self, group, feed_key, pending):
+        return feed_key in pending['feeds'].get(group, ()) or self.store.dedup_group_has_feed(group, feed_key)
+
+    def _pending_near(self, bands, feed_key, pending):
+        shared = {}
+        for band in bands:
+            for group in pending['bands'].get(band, ()):
+                shared[group] = shared.get(group, 0) + 1
+        groups = [group for group, count in shared.items()
+                  if count >= MIN_SHARED_BANDS and not self._claimed(group, feed_key, pending)]
+        return max(groups, key=shared.get) if groups else None
+
+    def assign(self, feed_url, guid, link, signature):
+        """Returns (group, is_duplicate) for one entry and records it for later lookups."""
+        with self._lock:
+            self._ensure_ready()
+            group, is_duplicate, keys = self._find(feed_url, guid, link, signature, self._new_pending())
+            if keys:
+                self.store.add_dedup_keys([keys])
+            return group, is_duplicate
+
+    @staticmethod
+    def _new_pending():
+        return {'entries': {}, 'links': {}, 'bands': {}, 'feeds': {}}
+
+    def assign_entries(self, entries):
+        """Sets 'dup_group' on each entry; returns how many were duplicates.
+
+        The batch is written in one transaction at the end; until then its own
+        entries are matched against each other in memory.
+        """
+        duplicates = 0
+        with self._lock:
+            self._ensure_ready()
+            pending = self._new_pending()
+            rows = []
+            for entry in entries:
+                group, is_duplicate, keys = self._find(entry.get('feed'), entry_guid(entry), entry.get('link'),
+                                                       entry_signature(entry), pending)
+                entry['dup_group'] = group
+                duplicates += is_duplicate
+                if keys:
+                    rows.append(keys)
+                    key, feed_key, hashed_link, _, bands = keys
+                    pending['entries'][key] = group
+                    pending['feeds'].setdefault(group, set()).add(feed_key)
+                    if hashed_link is not None:
+                        pending['links'].setdefault(hashed_link, []).append(group)
+                    for band in bands:
+                        pending['bands'].setdefault(band, []).append(group)
+            self.store.add_dedup_keys(rows)
+        return duplicates
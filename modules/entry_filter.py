@@ -0,0 +1,142 @@
+# modules/entry_filter.py
+
+import re
+from datetime import datetime, date, timedelta
+from itertools import compress
+from modules.entry_sorting import entry_epoch
+from modules.logging.logger import setup_logger
+
+logger = setup_logger('entry_filter')
+
+def _to_date(value):
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(str(value), '%Y-%m-%d').date()
+    except ValueError:
+        logger.warning("Ignoring invalid filter date: %s", value)
+        return None
+
+def _local_midnight(day):
+    return datetime(day.year, day.month, day.day).timestamp()
+
+class CompiledFilter:
+    """The filters dict compiled once: keyword regex, epoch bounds and a category set."""
+
+    def __init__(self, filters=None):
+        filters = filters or {}
+        keywords = sorted({keyword.strip().casefold() for keyword in filters.get('keywords') or [] if keyword and keyword.strip()})
+        self.keywords = tuple(keywords)
+        self.keyword_pattern = re.compile('|'.join(map(re.escape, keywords))) if keywords else None
+
+        date_range = filters.get('date_range') or {}
+        start, end = _to_date(date_range.get('start')), _to_date(date_range.get('end'))
+        self.start_epoch = _local_midnight(start) if start else None
+        # The end date is inclusive, so the bound is the following midnight.
+        self.end_epoch = _local_midnight(end + timedelta(days=1)) if end else None
+
+        self.categories = frozenset(filters.get('categories') or []) or None
+
+    @property
+    def keyword_key(self):
+        return self.keywords
+
+    @property
+    def date_key(self):
+        return (self.start_epoch, self.end_epoch)
+
+    @property
+    def category_key(self):
+        return self.categories
+
+    def is_empty(self):
+        return self.keyword_pattern is None and self.date_key == (None, None) and self.categories is None
+
+    def matches_text(self, text):
+        return self.keyword_pattern is None or self.keyword_pattern.search(text) is not None
+
+    def matches_epoch(self, epoch):
+        if self.start_epoch is None and self.end_epoch is None:
+            return True
+        if epoch is None:
+            return False
+        if self.start_epoch is not None and epoch < self.start_epoch:
+            return False
+        return self.end_epoch is None or epoch < self.end_epoch
+
+    def matches_category(self, category):
+        return self.categories is None or category in self.categories
+
+    def __call__(self, entry, category=None):
+        return (self.matches_category(category)
+                and self.matches_epoch(entry_epoch(entry))
+                and self.matches_text(entry_text(entry)))
+
+def compile_filter(filters):
+    return CompiledFilter(filters)
+
+def entry_text(entry):
+    return f"{getattr(entry, 'title', '') or ''}\n{getattr(entry, 'summary', '') or ''}".casefold()
+
+def _mask(flags):
+    # One byte per row (0 or 1) packed into an int, so masks AND in a single
+    # C-level operation and unpack straight into itertools.compress selectors.
+    return int.from_bytes(bytes(flags), 'little')
+
+class FilteredView:
+    """Filterable columns over one sorted entry list.
+
+    Text and epoch columns are extracted once. Each filter component keeps its
+    own mask keyed by that component, so changing one part of the filter
+    only rescans that column and the masks are combined with a single AND.
+    """
+
+    def __init__(self, entries, category=None, sorting=None):
+        self.entries = list(entries)
+        self.category = category
+        self.sorting = dict(sorting) if sorting else None
+        self.texts = [entry_text(entry) for entry in self.entries]
+        self.epochs = [entry_epoch(entry) for entry in self.entries]
+        self.visible = list(self.entries)
+        self._masks = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _component(self, name, key, build):
+        cached = self._masks.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        mask = build()
+        self._masks[name] = (key, mask)
+        return mask
+
+    def apply(self, compiled):
+        all_rows = _mask([1] * len(self.entries))
+        if not compiled.matches_category(self.category):
+            self.visible = []
+            return self.visible
+        keyword_mask = all_rows if compiled.keyword_pattern is None else self._component(
+            'keywords', compiled.keyword_key, lambda: _mask(compiled.matches_text(text) for text in self.texts))
+        date_mask = all_rows if compiled.date_key == (None, None) else self._component(
+            'date', compiled.date_key, lambda: _mask(compiled.matches_epoch(epoch) for epoch in self.epochs))
+        combined = keyword_mask & date_mask
+        if combined == all_rows:
+            self.visible = list(self.entries)
+        else:
+            self.visible = list(compress(self.entries, combined.to_bytes(len(self.entries), 'little')))
+        return self.visible
+
+    def remove(self, entry):
+        try:
+            row = self.entries.index(entry)
+        except ValueError:
+            return
+        del self.entries[row]
+        del self.texts[row]
+        del self.epochs[row]
+        self._masks.clear()
@@ -0,0 +1,68 @@
+# modules/entry_list_model.py
+
+from PySide6 import QtCore as qtc
+
+class EntryListModel(qtc.QAbstractListModel):
+    """List model over a feed's entry sequence that exposes rows in batches.
+
+    The view only creates rows as it scrolls towards them (canFetchMore /
+    fetchMore), and replacing the whole list is a single model reset, so no
+    per-entry widget items are ever allocated.
+    """
+
+    def __init__(self, parent=None, batch_size=500):
+        super().__init__(parent)
+        self.batch_size = batch_size
+        self._entries = []
+        self._loaded = 0
+
+    def rowCount(self, parent=qtc.QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def data(self, index, role=qtc.Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self._loaded:
+            return None
+        entry = self._entries[index.row()]
+        if role == qtc.Qt.DisplayRole:
+            return getattr(entry, 'title', '')
+        if role == qtc.Qt.ToolTipRole:
+            return getattr(entry, 'link', '')
+        return None
+
+    def canFetchMore(self, parent=qtc.QModelIndex()):
+        return not parent.isValid() and self._loaded < len(self._entries)
+
+    def fetchMore(self, parent=qtc.QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.batch_size, len(self._entries) - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(qtc.QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def set_entries(self, entries):
+        self.beginResetModel()
+        self._entries = entries
+        self._loaded = min(self.batch_size, len(entries))
+        self.endResetModel()
+
+    def clear(self):
+        self.set_entries([])
+
+    def entry(self, row):
+        if 0 <= row < self._loaded:
+            return self._entries[row]
+        return None
+
+    def entries(self):
+        return self._entries
+
+    def remove_row(self, row):
+        if not 0 <= row < self._loaded:
+            return
+        self.beginRemoveRows(qtc.QModelIndex(), row, row)
+        del self._entries[row]
+        self._loaded -= 1
+        self.endRemoveRows()
@@ -0,0 +1,64 @@
+# modules/feed_charset.py
+
+import codecs
+import re
+from modules.logging.logger import setup_logger
+
+logger = setup_logger('feed_charset')
+
+CHARDET_SAMPLE_BYTES = 64 * 1024
+
+_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+_XML_DECLARATION = re.compile(rb'^\s*<\?xml[^>]*?encoding\s*=\s*["\']([A-Za-z0-9._:-]+)["\']')
+_HEADER_CHARSET = re.compile(r'charset\s*=\s*["\']?([^"\';\s]+)', re.IGNORECASE)
+
+def _normalize(encoding):
+    if not encoding:
+        return None
+    try:
+        name = codecs.lookup(encoding).name
+    except LookupError:
+        return None
+    # An ASCII verdict on a sample says nothing about the rest of the body.
+    return 'utf-8' if name == 'ascii' else name
+
+def charset_from_content_type(content_type):
+    if not content_type:
+        return None
+    match = _HEADER_CHARSET.search(content_type)
+    return _normalize(match.group(1)) if match else None
+
+def charset_from_document(content):
+    for bom, encoding in _BOMS:
+        if content.startswith(bom):
+            return encoding
+    match = _XML_DECLARATION.match(content[:1024])
+    return _normalize(match.group(1).decode('ascii')) if match else None
+
+def charset_from_sample(content, sample_size=CHARDET_SAMPLE_BYTES):
+    import chardet
+    return _normalize(chardet.detect(content[:sample_size])['encoding'])
+
+def resolve_charset(content_type, content, sample_size=CHARDET_SAMPLE_BYTES):
+    """Resolve a feed's charset from the header, then BOM/XML declaration, then a chardet sample."""
+    encoding = charset_from_content_type(content_type)
+    if encoding:
+        return encoding, 'header'
+    encoding = charset_from_document(content)
+    if encoding:
+        return encoding, 'document'
+    encoding = charset_from_sample(content, sample_size)
+    if encoding:
+        return encoding, 'chardet'
+    return 'utf-8', 'default'
+
+def content_type_with_charset(content_type, encoding):
+    mime_type = (content_type or '').split(';', 1)[0].strip() or 'application/xml'
+    return f"{mime_type}; charset={encoding}"
@@ -0,0 +1,99 @@
+# modules/feed_entry.py
+
+from modules.entry_sorting import entry_epoch
+from modules.feed_store import entry_guid
+
+ENTRY_FIELDS = ('id', 'feed', 'title', 'link', 'published', 'published_epoch', 'summary',
+                'title_key', 'dup_group')
+
+class FeedEntry:
+    """The fields the reader actually uses, in a fixed-size slotted object.
+
+    A FeedParserDict keeps every key feedparser found (detail dicts, parsed
+    time tuples, links lists...) in a per-entry dict; this keeps nine slots
+    and no __dict__. get() and item access mirror FeedParserDict, so code
+    written against parsed entries keeps working.
+    """
+
+    __slots__ = ENTRY_FIELDS
+
+    def __init__(self, id=None, feed=None, title='', link='', published='', published_epoch=None, summary='',
+                 title_key=None, dup_group=None):
+        self.id = id
+        self.feed = feed
+        self.title = title
+        self.link = link
+        self.published = published
+        self.published_epoch = published_epoch
+        self.summary = summary
+        self.title_key = title_key
+        self.dup_group = dup_group
+
+    def get(self, key, default=None):
+        if key in ENTRY_FIELDS:
+            value = getattr(self, key)
+            return default if value is None else value
+        return default
+
+    def __getitem__(self, key):
+        if key not in ENTRY_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in ENTRY_FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in ENTRY_FIELDS and getattr(self, key) is not None
+
+    def __repr__(self):
+        return f"FeedEntry(id={self.id!r}, feed={self.feed!r}, title={self.title!r})"
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in ENTRY_FIELDS}
+
+def _title_key(title):
+    key = title.casefold()
+    # Already-folded titles share one string instead of holding a copy.
+    return title if key == title else key
+
+def from_parsed(entry, feed_url=None, fetched_at=None):
+    """FeedEntry from a feedparser (or FeedStream) entry."""
+    title = entry.get('title') or ''
+    link = entry.get('link') or ''
+    # Always set, so date order can fall back to it as a per-feed tiebreak.
+    guid = entry_guid(entry)
+    epoch = entry_epoch(entry, fetched_at)
+    return FeedEntry(
+        # Permalink GUIDs equal the link; keep one string for both.
+        id=link if guid == link else guid,
+        feed=feed_url,
+        title=title,
+        link=link,
+        published=entry.get('published') or entry.get('updated') or '',
+        published_epoch=epoch,
+        summary=entry.get('summary') or '',
+        title_key=entry.get('title_key') or _title_key(title),
+        dup_group=entry.get('dup_group'),
+    )
+
+def from_row(row, feed_url=None):
+    """FeedEntry from a feed store row (guid selected AS id)."""
+    keys = row.keys()
+    title = row['title'] or ''
+    return FeedEntry(
+        id=row['id'],
+        feed=row['feed_url'] if 'feed_url' in keys else feed_url,
+        title=title,
+        link=row['link'] or '',
+        published=row['published'] or '',
+        published_epoch=row['published_epoch'],
+        summary=row['summary'] or '',
+        title_key=_title_key(title),
+        dup_group=row['dup_group'] if 'dup_group' in keys else None,
+    )
+
+def to_feed_entries(entries, feed_url=None, fetched_at=None):
+    return [entry if isinstance(entry, FeedEntry) else from_parsed(entry, feed_url, fetched_at) for entry in entries]
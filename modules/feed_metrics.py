@@ -0,0 +1,178 @@
+# modules/feed_metrics.py
+
+import http.server
+import threading
+from bisect import bisect_left
+from modules.logging.logger import setup_logger
+
+logger = setup_logger('feed_metrics')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TIMINGS = ('connect', 'ttfb', 'total', 'read', 'decode', 'parse')
+COUNTERS = ('fetches', 'not_modified', 'bytes', 'entries', 'new_entries', 'errors')
+
+class Histogram:
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else None,
+            'buckets': dict(zip([*map(str, LATENCY_BUCKETS), '+Inf'], self.counts)),
+        }
+
+class FeedMetrics:
+    __slots__ = ('counters', 'status_codes', 'error_kinds', 'timings')
+
+    def __init__(self):
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.status_codes = {}
+        self.error_kinds = {}
+        self.timings = {name: Histogram() for name in TIMINGS}
+
+    def snapshot(self):
+        return {
+            **self.counters,
+            'status_codes': dict(self.status_codes),
+            'error_kinds': dict(self.error_kinds),
+            'timings': {name: histogram.snapshot() for name, histogram in self.timings.items()},
+        }
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class MetricsRegistry:
+    """Per-feed fetch counters and latency histograms.
+
+    Recording is a dict lookup and a few integer updates under one lock, so
+    it costs microseconds against a fetch that takes milliseconds.
+    """
+
+    def __init__(self):
+        self._feeds = {}
+        self._lock = threading.Lock()
+
+    def _feed(self, feed_url):
+        metrics = self._feeds.get(feed_url)
+        if metrics is None:
+            metrics = self._feeds[feed_url] = FeedMetrics()
+        return metrics
+
+    def record_fetch(self, feed_url, status=None, nbytes=0, entries=0, new_entries=0, not_modified=False, **timings):
+        with self._lock:
+            metrics = self._feed(feed_url)
+            counters = metrics.counters
+            counters['fetches'] += 1
+            counters['not_modified'] += not_modified
+            counters['bytes'] += nbytes
+            counters['entries'] += entries
+            counters['new_entries'] += new_entries
+            if status is not None:
+                metrics.status_codes[status] = metrics.status_codes.get(status, 0) + 1
+            for name, value in timings.items():
+                if value is not None:
+                    metrics.timings[name].observe(value)
+
+    def record_error(self, feed_url, kind, status=None, **timings):
+        with self._lock:
+            metrics = self._feed(feed_url)
+            metrics.counters['errors'] += 1
+            metrics.error_kinds[kind] = metrics.error_kinds.get(kind, 0) + 1
+            if status is not None:
+                metrics.status_codes[status] = metrics.status_codes.get(status, 0) + 1
+            for name, value in timings.items():
+                if value is not None:
+                    metrics.timings[name].observe(value)
+
+    def remove(self, feed_url):
+        with self._lock:
+            self._feeds.pop(feed_url, None)
+
+    def get_stats(self, feed_url=None):
+        with self._lock:
+            if feed_url is not None:
+                metrics = self._feeds.get(feed_url)
+                return metrics.snapshot() if metrics else None
+            feeds = {url: metrics.snapshot() for url, metrics in self._feeds.items()}
+        totals = dict.fromkeys(COUNTERS, 0)
+        for stats in feeds.values():
+            for name in COUNTERS:
+                totals[name] += stats[name]
+        return {'feeds': feeds, 'totals': totals}
+
+    def to_prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            feeds = {url: metrics.snapshot() for url, metrics in self._feeds.items()}
+        lines = []
+        for name in COUNTERS:
+            lines.append(f"# TYPE rss_feed_{name}_total counter")
+            lines.extend(f'rss_feed_{name}_total{{feed="{_label(url)}"}} {stats[name]}' for url, stats in feeds.items())
+        lines.append("# TYPE rss_feed_responses_total counter")
+        for url, stats in feeds.items():
+            lines.extend(f'rss_feed_responses_total{{feed="{_label(url)}",code="{code}"}} {count}'
+                         for code, count in stats['status_codes'].items())
+        lines.append("# TYPE rss_feed_error_kinds_total counter")
+        for url, stats in feeds.items():
+            lines.extend(f'rss_feed_error_kinds_total{{feed="{_label(url)}",kind="{_label(kind)}"}} {count}'
+                         for kind, count in stats['error_kinds'].items())
+        for timing in TIMINGS:
+            metric = f"rss_feed_{timing}_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            for url, stats in feeds.items():
+                histogram = stats['timings'][timing]
+                feed = _label(url)
+                cumulative = 0
+                for bound, count in histogram['buckets'].items():
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{feed="{feed}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{feed="{feed}"}} {histogram["sum"]}')
+                lines.append(f'{metric}_count{{feed="{feed}"}} {histogram["count"]}')
+        return '\n'.join(lines) + '\n'
+
+class MetricsServer:
+    """Serves registry.to_prometheus() at /metrics from a daemon thread (localhost by default)."""
+
+    def __init__(self, registry, host='127.0.0.1', port=9464):
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.to_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = http.server.ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name='rss-metrics', daemon=True)
+
+    @property
+    def address(self):
+        return self.server.server_address[:2]
+
+    def start(self):
+        self.thread.start()
+        logger.info("Serving metrics on http://%s:%s/metrics", self.address[0], self.address[1])
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
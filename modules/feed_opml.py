@@ -0,0 +1,89 @@
+# modules/feed_opml.py
+
+import time
+import xml.etree.ElementTree as ET
+from email.utils import formatdate
+from xml.sax.saxutils import escape, quoteattr
+from modules.logging.logger import setup_logger
+
+logger = setup_logger('feed_opml')
+
+# Nested folders are flattened into one category string and split back on export.
+CATEGORY_SEPARATOR = '/'
+
+class OpmlError(Exception):
+    pass
+
+def _outline_title(element):
+    return (element.get('text') or element.get('title') or '').strip()
+
+def iter_opml(source):
+    """Yields (xml_url, category) for every feed outline in an OPML file or file object.
+
+    The file is parsed incrementally and finished outlines are dropped as
+    they close, so memory stays flat however many subscriptions it holds.
+    Folder outlines (no xmlUrl) become the category of the feeds inside
+    them; nested folders are joined with CATEGORY_SEPARATOR.
+    """
+    stack = []
+    folders = []
+    try:
+        for event, element in ET.iterparse(source, events=('start', 'end')):
+            if event == 'start':
+                stack.append(element)
+                if element.tag == 'outline' and not element.get('xmlUrl'):
+                    folders.append(_outline_title(element))
+                continue
+            stack.pop()
+            if element.tag != 'outline':
+                continue
+            xml_url = (element.get('xmlUrl') or '').strip()
+            if xml_url:
+                category = CATEGORY_SEPARATOR.join(folder for folder in folders if folder)
+                if not category:
+                    # OPML 2.0 category attribute: comma-separated "/a/b" paths.
+                    category = (element.get('category') or '').split(',')[0].strip().strip(CATEGORY_SEPARATOR)
+                yield xml_url, category or None
+            else:
+                folders.pop()
+            if stack:
+                stack[-1].remove(element)
+    except ET.ParseError as e:
+        raise OpmlError(f"Invalid OPML: {str(e)}")
+
+def _category_path(feed):
+    return tuple(part for part in (feed.category or '').split(CATEGORY_SEPARATOR) if part)
+
+def write_opml(feeds, destination, title="RSS subscriptions"):
+    """Writes feeds as OPML 2.0, nesting outlines by category path. Returns the feed count."""
+    if isinstance(destination, (str, bytes)) or hasattr(destination, '__fspath__'):
+        with open(destination, 'w', encoding='utf-8') as file:
+            return write_opml(feeds, file, title)
+    write = destination.write
+    write('<?xml version="1.0" encoding="utf-8"?>\n<opml version="2.0">\n<head>\n')
+    write(f'  <title>{escape(title)}</title>\n  <dateCreated>{formatdate(time.time())}</dateCreated>\n')
+    write('</head>\n<body>\n')
+    open_path = ()
+    count = 0
+    for feed in sorted(feeds, key=_category_path):
+        path = _category_path(feed)
+        common = 0
+        while common < min(len(path), len(open_path)) and path[common] == open_path[common]:
+            common += 1
+        for depth in range(len(open_path), common, -1):
+            write('  ' * depth + '</outline>\n')
+        for depth in range(common, len(path)):
+            write('  ' * (depth + 1) + f'<outline text={quoteattr(path[depth])} title={quoteattr(path[depth])}>\n')
+        open_path = path
+        write('  ' * (len(path) + 1) + f'<outline type="rss" text={quoteattr(feed.url)} xmlUrl={quoteattr(feed.url)}/>\n')
+        count += 1
+    for depth in range(len(open_path), 0, -1):
+        write('  ' * depth + '</outline>\n')
+    write('</body>\n</opml>\n')
+    return count
+
+class OpmlImportResult:
+    def __init__(self, added=None, skipped=0, dead=None):
+        self.added = added or []
+        self.skipped = skipped
+        self.dead = dead or []
@@ -0,0 +1,100 @@
+# modules/feed_registry.py
+
+import threading
+
+class FeedRegistry:
+    """Subscriptions indexed by URL, category and enabled state.
+
+    Lookups by URL are a dict hit, and get_feeds/get_categories read the
+    secondary indexes instead of scanning every subscription. Iteration
+    keeps insertion order, like the list it replaces.
+    """
+
+    def __init__(self, feeds=()):
+        self._by_url = {}
+        self._by_category = {}
+        self._by_enabled = {True: {}, False: {}}
+        self._lock = threading.RLock()
+        self.add_many(feeds)
+
+    def __len__(self):
+        return len(self._by_url)
+
+    def __contains__(self, feed_url):
+        return feed_url in self._by_url
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._by_url.values()))
+
+    def get(self, feed_url):
+        return self._by_url.get(feed_url)
+
+    def _index(self, feed):
+        self._by_category.setdefault(feed.category, {})[feed.url] = feed
+        self._by_enabled[bool(feed.enabled)][feed.url] = feed
+
+    def _unindex(self, feed):
+        members = self._by_category.get(feed.category)
+        if members is not None:
+            members.pop(feed.url, None)
+            if not members:
+                del self._by_category[feed.category]
+        self._by_enabled[bool(feed.enabled)].pop(feed.url, None)
+
+    def add(self, feed):
+        """Adds feed unless its URL is already registered; returns whether it was added."""
+        with self._lock:
+            if feed.url in self._by_url:
+                return False
+            self._by_url[feed.url] = feed
+            self._index(feed)
+            return True
+
+    def add_many(self, feeds):
+        with self._lock:
+            return [feed for feed in feeds if self.add(feed)]
+
+    def update(self, feed_url, category=None, enabled=None):
+        with self._lock:
+            feed = self._by_url.get(feed_url)
+            if feed is None:
+                return None
+            self._unindex(feed)
+            if category is not None:
+                feed.category = category
+            if enabled is not None:
+                feed.enabled = enabled
+            self._index(feed)
+            return feed
+
+    def update_many(self, feed_urls, category=None, enabled=None):
+        with self._lock:
+            updated = (self.update(feed_url, category, enabled) for feed_url in feed_urls)
+            return [feed for feed in updated if feed is not None]
+
+    def remove(self, feed_url):
+        with self._lock:
+            feed = self._by_url.pop(feed_url, None)
+            if feed is not None:
+                self._unindex(feed)
+            return feed
+
+    def remove_many(self, feed_urls):
+        with self._lock:
+            removed = (self.remove(feed_url) for feed_url in feed_urls)
+            return [feed for feed in removed if feed is not None]
+
+    def get_feeds(self, category=None, enabled=True):
+        with self._lock:
+            by_state = self._by_enabled[bool(enabled)]
+            if not category:
+                return list(by_state.values())
+            members = self._by_category.get(category, {})
+            if len(members) <= len(by_state):
+                return [feed for feed in members.values() if bool(feed.enabled) == bool(enabled)]
+            return [feed for feed in by_state.values() if feed.category == category]
+
+    def categories(self):
+        with self._lock:
+            return [category for category in self._by_category if category]
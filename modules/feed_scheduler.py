@@ -0,0 +1,151 @@
+# modules/feed_scheduler.py
+
+import heapq
+import random
+import re
+import statistics
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from modules.entry_sorting import entry_epoch
+from modules.logging.logger import setup_logger
+
+logger = setup_logger('feed_scheduler')
+
+UPDATE_PERIOD_SECS = {
+    'hourly': 3600,
+    'daily': 86400,
+    'weekly': 7 * 86400,
+    'monthly': 30 * 86400,
+    'yearly': 365 * 86400,
+}
+
+_MAX_AGE = re.compile(r'max-age\s*=\s*(\d+)', re.IGNORECASE)
+
+def publish_cadence(entries, sample=20):
+    """Median gap in seconds between consecutive dated entries, or None."""
+    # published_epoch is set at ingest for FeedEntry objects and stream-parsed
+    # dicts alike; entry_epoch also covers raw feedparser entries.
+    epochs = {entry_epoch(entry) for entry in entries}
+    epochs.discard(None)
+    epochs = sorted(epochs, reverse=True)[:sample + 1]
+    gaps = [newer - older for newer, older in zip(epochs, epochs[1:]) if newer > older]
+    return statistics.median(gaps) if gaps else None
+
+def server_hint(feed_info=None, headers=None, now=None):
+    """Longest minimum poll interval in seconds requested by the feed or the server, or None."""
+    hints = []
+    if feed_info:
+        try:
+            hints.append(int(feed_info.get('ttl')) * 60)
+        except (TypeError, ValueError):
+            pass
+        period = UPDATE_PERIOD_SECS.get(str(feed_info.get('sy_updateperiod', '')).strip().lower())
+        if period:
+            try:
+                frequency = max(int(feed_info.get('sy_updatefrequency', 1)), 1)
+            except (TypeError, ValueError):
+                frequency = 1
+            hints.append(period / frequency)
+    if headers:
+        cache_control = headers.get('Cache-Control', '')
+        match = _MAX_AGE.search(cache_control)
+        if match and 'no-cache' not in cache_control.lower():
+            hints.append(int(match.group(1)))
+        elif headers.get('Expires'):
+            try:
+                hints.append(parsedate_to_datetime(headers['Expires']).timestamp() - (now or time.time()))
+            except (TypeError, ValueError, IndexError):
+                pass
+    hints = [hint for hint in hints if hint > 0]
+    return max(hints) if hints else None
+
+class FeedScheduler:
+    """Priority queue of per-feed refresh times with intervals adapted to each feed.
+
+    A feed is polled at about half its observed publishing gap, never more often
+    than its <ttl>, <sy:updatePeriod> or Cache-Control/Expires allow, and always
+    within [min_interval_secs, max_interval_secs], with random jitter so feeds
+    added together do not stay in lockstep.
+    """
+
+    def __init__(self, base_interval_secs=1800, min_interval_secs=300, max_interval_secs=86400, jitter=0.1):
+        self.base_interval_secs = base_interval_secs
+        self.min_interval_secs = min_interval_secs
+        self.max_interval_secs = max_interval_secs
+        self.jitter = jitter
+        self.intervals = {}
+        self._due = {}
+        self._heap = []
+        self._failures = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._due)
+
+    def __contains__(self, feed_url):
+        return feed_url in self._due
+
+    def add(self, feed_url, delay=None):
+        if delay is None:
+            delay = random.uniform(0, self.jitter * self.base_interval_secs)
+        with self._lock:
+            self._push(feed_url, time.time() + delay)
+
+    def remove(self, feed_url):
+        with self._lock:
+            self._due.pop(feed_url, None)
+            self.intervals.pop(feed_url, None)
+            self._failures.pop(feed_url, None)
+
+    def record_fetch(self, feed_url, entries=None, feed_info=None, headers=None):
+        interval = self.base_interval_secs
+        cadence = publish_cadence(entries) if entries else None
+        if cadence:
+            interval = cadence / 2
+        hint = server_hint(feed_info, headers)
+        if hint:
+            interval = max(interval, hint)
+        interval = min(max(interval, self.min_interval_secs), self.max_interval_secs)
+        with self._lock:
+            self._failures.pop(feed_url, None)
+            self.intervals[feed_url] = interval
+            due = self._push(feed_url, time.time() + self._jittered(interval))
+        logger.debug("Next refresh of RSS feed in %.0fs: %s", interval, feed_url)
+        return due
+
+    def record_failure(self, feed_url):
+        with self._lock:
+            failures = self._failures.get(feed_url, 0) + 1
+            self._failures[feed_url] = failures
+            interval = min(self.intervals.get(feed_url, self.base_interval_secs) * 2 ** failures, self.max_interval_secs)
+            return self._push(feed_url, time.time() + self._jittered(interval))
+
+    def pop_due(self, now=None):
+        now = now or time.time()
+        due_urls = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                due, feed_url = heapq.heappop(self._heap)
+                if self._due.get(feed_url) == due:
+                    # Re-queued at the base interval until the fetch reports back.
+                    self._push(feed_url, now + self.intervals.get(feed_url, self.base_interval_secs))
+                    due_urls.append(feed_url)
+        return due_urls
+
+    def next_due_in(self, now=None):
+        now = now or time.time()
+        with self._lock:
+            while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            if not self._heap:
+                return None
+            return max(self._heap[0][0] - now, 0.0)
+
+    def _push(self, feed_url, due):
+        self._due[feed_url] = due
+        heapq.heappush(self._heap, (due, feed_url))
+        return due
+
+    def _jittered(self, interval):
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
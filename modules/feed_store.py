@@ -0,0 +1,341 @@
+# modules/feed_store.py
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from modules.entry_sorting import entry_epoch
+from modules.logging.logger import setup_logger
+
+logger = setup_logger('feed_store')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feeds (
+    url TEXT PRIMARY KEY,
+    category TEXT,
+    enabled INTEGER NOT NULL DEFAULT 1,
+    etag TEXT,
+    last_modified TEXT,
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    feed_url TEXT NOT NULL,
+    guid TEXT NOT NULL,
+    title TEXT,
+    link TEXT,
+    published TEXT,
+    published_epoch REAL,
+    summary TEXT,
+    fetched_at REAL,
+    dup_group TEXT,
+    UNIQUE (feed_url, guid)
+);
+CREATE INDEX IF NOT EXISTS idx_entries_feed_published ON entries (feed_url, published_epoch);
+CREATE INDEX IF NOT EXISTS idx_entries_published ON entries (published_epoch);
+CREATE INDEX IF NOT EXISTS idx_entries_guid ON entries (guid);
+-- Duplicate-detection keys, all signed 64-bit hashes (see entry_dedup). An
+-- entry's bands outlive it when its feed is deleted; the join drops them.
+CREATE TABLE IF NOT EXISTS dedup_entries (
+    entry_key INTEGER PRIMARY KEY,
+    feed_key INTEGER NOT NULL,
+    link_hash INTEGER,
+    dup_group TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_dedup_entries_link ON dedup_entries (link_hash);
+CREATE INDEX IF NOT EXISTS idx_dedup_entries_feed ON dedup_entries (feed_key);
+CREATE INDEX IF NOT EXISTS idx_dedup_entries_group ON dedup_entries (dup_group, feed_key);
+CREATE TABLE IF NOT EXISTS dedup_bands (
+    band_key INTEGER NOT NULL,
+    entry_key INTEGER NOT NULL,
+    PRIMARY KEY (band_key, entry_key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+UPSERT_ENTRY = """
+INSERT INTO entries (feed_url, guid, title, link, published, published_epoch, summary, fetched_at, dup_group)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (feed_url, guid) DO UPDATE SET
+    title = excluded.title,
+    link = excluded.link,
+    published = excluded.published,
+    published_epoch = excluded.published_epoch,
+    summary = excluded.summary,
+    dup_group = excluded.dup_group
+WHERE entries.title IS NOT excluded.title
+   OR entries.link IS NOT excluded.link
+   OR entries.published IS NOT excluded.published
+   OR entries.summary IS NOT excluded.summary
+   OR entries.dup_group IS NOT excluded.dup_group
+"""
+
+# External-content FTS5 index over entries, kept in sync by triggers so every
+# upsert from a refresh is searchable without a separate indexing pass.
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5 (
+    title, summary, link,
+    content = 'entries', content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+);
+CREATE TRIGGER IF NOT EXISTS entries_fts_insert AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts (rowid, title, summary, link) VALUES (new.id, new.title, new.summary, new.link);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_fts_delete AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts (entries_fts, rowid, title, summary, link) VALUES ('delete', old.id, old.title, old.summary, old.link);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_fts_update AFTER UPDATE OF title, summary, link ON entries BEGIN
+    INSERT INTO entries_fts (entries_fts, rowid, title, summary, link) VALUES ('delete', old.id, old.title, old.summary, old.link);
+    INSERT INTO entries_fts (rowid, title, summary, link) VALUES (new.id, new.title, new.summary, new.link);
+END;
+"""
+
+_SEARCH_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+
+class FeedStoreError(Exception):
+    pass
+
+def build_search_query(text):
+    """Turns user input into an FTS5 query: "quoted phrases", prefix* terms, implicit AND."""
+    terms = []
+    for phrase, word in _SEARCH_TOKEN.findall(text or ''):
+        if phrase.strip():
+            terms.append('"' + phrase.strip().replace('"', '""') + '"')
+        elif word:
+            prefix = word.endswith('*')
+            word = word.rstrip('*').replace('"', '""')
+            if word:
+                terms.append(f'"{word}"*' if prefix else f'"{word}"')
+    return ' '.join(terms)
+
+def entry_row(feed_url, entry, fetched_at):
+    return (feed_url, entry_guid(entry), entry.get('title', ''), entry.get('link', ''),
+            entry.get('published', ''), entry_epoch(entry), entry.get('summary', ''), fetched_at,
+            entry.get('dup_group'))
+
+def entry_guid(entry):
+    guid = entry.get('id') or entry.get('guid') or entry.get('link')
+    if guid:
+        return guid
+    fingerprint = f"{entry.get('title', '')}\x00{entry.get('published', '')}"
+    return hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()
+
+# A duplicate group holds at most one entry per feed: entries of one feed are
+# distinct items even when their titles follow a template.
+_NO_ENTRY_FROM_FEED = ("NOT EXISTS (SELECT 1 FROM dedup_entries o "
+                       "WHERE o.dup_group = d.dup_group AND o.feed_key = ?)")
+
+def dedup_key(text):
+    # Keys of the dedup tables: 64-bit hashes, signed to fit SQLite integers.
+    value = int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+class FeedStore:
+    """SQLite persistence for subscriptions, their entries and store metadata."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        try:
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            self.conn.row_factory = sqlite3.Row
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            with self.conn:
+                self.conn.executescript(SCHEMA)
+                self._ensure_column('entries', 'dup_group', 'TEXT')
+                self.conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_dup_group ON entries (dup_group)")
+        except sqlite3.Error as e:
+            logger.exception("Error occurred while opening feed store: %s", e)
+            raise FeedStoreError(f"Failed to open feed store: {path}.")
+        self.search_enabled = self._create_search_index()
+
+    def _ensure_column(self, table, column, declaration):
+        # Adds columns introduced after a store was first created.
+        columns = {row['name'] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+    def _create_search_index(self):
+        try:
+            exists = self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'entries_fts'").fetchone()
+            with self.conn:
+                self.conn.executescript(SEARCH_SCHEMA)
+                if not exists:
+                    # Index entries stored before the search index existed.
+                    self.conn.execute("INSERT INTO entries_fts (entries_fts) VALUES ('rebuild')")
+            return True
+        except sqlite3.OperationalError as e:
+            logger.warning("SQLite FTS5 unavailable, entry search falls back to a table scan: %s", e)
+            return False
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def get_metadata(self, key, default=None):
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM metadata WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else default
+
+    def set_metadata(self, key, value):
+        with self._lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)", (key, value))
+
+    def load_feeds(self):
+        with self._lock:
+            return self.conn.execute("SELECT url, category, enabled, etag, last_modified FROM feeds ORDER BY rowid").fetchall()
+
+    def save_feeds(self, feeds):
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO feeds (url, category, enabled, etag, last_modified, updated_at) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (url) DO UPDATE SET category = excluded.category, enabled = excluded.enabled, "
+                "etag = excluded.etag, last_modified = excluded.last_modified, updated_at = excluded.updated_at",
+                [(feed.url, feed.category, int(feed.enabled), feed.etag, feed.last_modified, time.time()) for feed in feeds])
+
+    def save_feed(self, feed):
+        self.save_feeds([feed])
+
+    def delete_feed(self, feed_url):
+        self.delete_feeds([feed_url])
+
+    def delete_feeds(self, feed_urls):
+        params = [(feed_url,) for feed_url in feed_urls]
+        with self._lock, self.conn:
+            self.conn.executemany("DELETE FROM entries WHERE feed_url = ?", params)
+            self.conn.executemany("DELETE FROM dedup_entries WHERE feed_key = ?",
+                                  [(dedup_key(feed_url),) for feed_url in feed_urls])
+            self.conn.executemany("DELETE FROM feeds WHERE url = ?", params)
+
+    def upsert_entries(self, feed_url, entries, fetched_at=None):
+        fetched_at = fetched_at or time.time()
+        rows = [entry_row(feed_url, entry, fetched_at) for entry in entries]
+        with self._lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(UPSERT_ENTRY, rows)
+            changed = self.conn.total_changes - before
+        logger.info("Stored %s new or changed entries for RSS feed: %s", changed, feed_url)
+        return changed
+
+    def get_entries(self, feed_url, limit=None):
+        # Served from idx_entries_feed_published: one feed's rows, newest first,
+        # without touching any other feed's entries.
+        with self._lock:
+            return self.conn.execute(
+                "SELECT guid AS id, title, link, published, published_epoch, summary, dup_group FROM entries "
+                "WHERE feed_url = ? ORDER BY published_epoch DESC LIMIT ?", (feed_url, limit or -1)).fetchall()
+
+    def get_duplicates(self, dup_group):
+        with self._lock:
+            return self.conn.execute(
+                "SELECT feed_url, guid AS id, title, link, published, published_epoch, summary, dup_group FROM entries "
+                "WHERE dup_group = ? ORDER BY published_epoch", (dup_group,)).fetchall()
+
+    def get_grouped_entries(self, after_id, limit):
+        """One batch of grouped entries, by id, for indexing them for duplicate detection."""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT id, feed_url, guid, title, link, summary, dup_group FROM entries "
+                "WHERE id > ? AND dup_group IS NOT NULL ORDER BY id LIMIT ?", (after_id, limit)).fetchall()
+
+    def get_dedup_group(self, entry_key):
+        with self._lock:
+            row = self.conn.execute("SELECT dup_group FROM dedup_entries WHERE entry_key = ?", (entry_key,)).fetchone()
+        return row['dup_group'] if row else None
+
+    def get_dedup_group_by_link(self, link_hash, feed_key):
+        """Group of a stored entry with this link, among groups with no entry from feed_key."""
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT d.dup_group FROM dedup_entries d WHERE d.link_hash = ? AND {_NO_ENTRY_FROM_FEED} LIMIT 1",
+                (link_hash, feed_key)).fetchone()
+        return row['dup_group'] if row else None
+
+    def find_near_dedup_group(self, band_keys, min_shared, feed_key):
+        """Group of the stored entry sharing the most (at least min_shared) of band_keys,
+        among groups with no entry from feed_key."""
+        placeholders = ','.join('?' * len(band_keys))
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT d.dup_group FROM dedup_bands b JOIN dedup_entries d ON d.entry_key = b.entry_key "
+                f"WHERE b.band_key IN ({placeholders}) AND {_NO_ENTRY_FROM_FEED} "
+                "GROUP BY b.entry_key HAVING COUNT(*) >= ? ORDER BY COUNT(*) DESC LIMIT 1",
+                (*band_keys, feed_key, min_shared)).fetchone()
+        return row['dup_group'] if row else None
+
+    def dedup_group_has_feed(self, dup_group, feed_key):
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM dedup_entries WHERE dup_group = ? AND feed_key = ? LIMIT 1",
+                                     (dup_group, feed_key)).fetchone() is not None
+
+    def add_dedup_keys(self, rows):
+        """rows: (entry_key, feed_key, link_hash, dup_group, band_keys) per entry."""
+        if not rows:
+            return
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO dedup_entries (entry_key, feed_key, link_hash, dup_group) VALUES (?, ?, ?, ?)",
+                [row[:4] for row in rows])
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO dedup_bands (band_key, entry_key) VALUES (?, ?)",
+                [(band, row[0]) for row in rows for band in row[4]])
+
+    def search(self, text, limit=100, feed_url=None, order='recent'):
+        """Full-text search over title, summary and link.
+
+        order='recent' walks the index newest-stored first and stops at limit,
+        which stays fast for common terms; order='relevance' ranks every match by bm25.
+        """
+        query = build_search_query(text)
+        if not query:
+            return []
+        feed_filter = "AND e.feed_url = ?" if feed_url else ""
+        order_by = "rank" if order == 'relevance' else "entries_fts.rowid DESC"
+        with self._lock:
+            if self.search_enabled:
+                params = [query] + ([feed_url] if feed_url else []) + [limit]
+                return self.conn.execute(
+                    "SELECT e.feed_url, e.guid AS id, e.title, e.link, e.published, e.published_epoch, e.summary "
+                    "FROM entries_fts JOIN entries e ON e.id = entries_fts.rowid "
+                    f"WHERE entries_fts MATCH ? {feed_filter} ORDER BY {order_by} LIMIT ?", params).fetchall()
+            pattern = f"%{text.strip()}%"
+            params = [pattern, pattern] + ([feed_url] if feed_url else []) + [limit]
+            return self.conn.execute(
+                "SELECT e.feed_url, e.guid AS id, e.title, e.link, e.published, e.published_epoch, e.summary "
+                f"FROM entries e WHERE (e.title LIKE ? OR e.summary LIKE ?) {feed_filter} "
+                "ORDER BY e.published_epoch DESC LIMIT ?", params).fetchall()
+
+    def delete_entry(self, feed_url, entry_title):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM entries WHERE feed_url = ? AND title = ?", (feed_url, entry_title))
+
+    def migrate_from_json(self, json_path):
+        """Imports the legacy feeds.json layout once; later calls are no-ops."""
+        if self.get_metadata('feeds_json_migrated') or not os.path.exists(json_path):
+            return False
+        logger.info("Migrating %s into feed store %s", json_path, self.path)
+        try:
+            with open(json_path, "r") as file:
+                feed_data = json.load(file)
+            with self._lock, self.conn:
+                for category, data in feed_data.items():
+                    category = None if category in ("null", "None", "") else category
+                    for feed in data.get("feeds", []):
+                        self.conn.execute(
+                            "INSERT OR IGNORE INTO feeds (url, category, enabled, updated_at) VALUES (?, ?, 1, ?)",
+                            (feed["url"], category, time.time()))
+                    for feed_url, entries in data.get("entries", {}).items():
+                        self.conn.executemany(UPSERT_ENTRY, [entry_row(feed_url, entry, time.time()) for entry in entries])
+                self.conn.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES ('feeds_json_migrated', ?)",
+                                  (str(time.time()),))
+            return True
+        except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+            logger.exception("Error occurred while migrating feeds.json: %s", e)
+            raise FeedStoreError(f"Failed to migrate {json_path} into the feed store.")
@@ -0,0 +1,176 @@
+# modules/feed_stream.py
+
+import codecs
+import time
+import xml.etree.ElementTree as ET
+from modules.feed_store import entry_guid
+from modules.logging.logger import setup_logger
+
+logger = setup_logger('feed_stream')
+
+CHUNK_SIZE = 16 * 1024
+
+ATOM_NS = 'http://www.w3.org/2005/Atom'
+CONTENT_NS = 'http://purl.org/rss/1.0/modules/content/'
+DC_NS = 'http://purl.org/dc/elements/1.1/'
+SY_NS = 'http://purl.org/rss/1.0/modules/syndication/'
+RDF_ABOUT = '{http://www.w3.org/1999/02/22-rdf-syntax-ns#}about'
+
+ENTRY_TAGS = frozenset(('item', 'entry'))
+FEED_TAGS = frozenset(('rss', 'RDF', 'feed'))
+
+class FeedStreamError(Exception):
+    pass
+
+def _split(tag):
+    if tag[:1] == '{':
+        namespace, _, local = tag[1:].partition('}')
+        return namespace, local
+    return '', tag
+
+def _text(element):
+    if len(element):
+        # Inline XHTML (Atom type="xhtml"): keep the text, drop the markup.
+        return ''.join(element.itertext()).strip()
+    return (element.text or '').strip()
+
+def _atom_link(entry, element):
+    rel = element.get('rel', 'alternate')
+    href = element.get('href')
+    if href and rel == 'alternate' and not entry.get('link'):
+        entry['link'] = href
+
+def _read_entry(element):
+    # Fields are named as feedparser names them, so entries from either parser
+    # get the same GUID in the store and look the same everywhere else.
+    entry = {}
+    content = None
+    permalink = None
+    if element.get(RDF_ABOUT):
+        entry['id'] = element.get(RDF_ABOUT)
+    for child in element:
+        namespace, name = _split(child.tag)
+        if name == 'link' and namespace == ATOM_NS:
+            _atom_link(entry, child)
+        elif name == 'link' and not entry.get('link'):
+            entry['link'] = _text(child)
+        elif name in ('guid', 'id'):
+            entry['id'] = _text(child)
+            if name == 'guid' and child.get('isPermaLink', 'true').lower() != 'false':
+                permalink = entry['id']
+        elif name == 'title':
+            entry['title'] = _text(child)
+        elif name in ('description', 'summary'):
+            entry['summary'] = _text(child)
+        elif name == 'encoded' and namespace == CONTENT_NS or name == 'content' and namespace == ATOM_NS:
+            content = _text(child)
+        elif name in ('pubDate', 'published') or name == 'date' and namespace == DC_NS:
+            entry['published'] = _text(child)
+        elif name == 'updated':
+            entry['updated'] = _text(child)
+        elif name in ('author', 'creator'):
+            entry['author'] = _text(child)
+    if 'summary' not in entry and content is not None:
+        entry['summary'] = content
+    if not entry.get('link') and permalink:
+        entry['link'] = permalink
+    if 'published' not in entry and 'updated' in entry:
+        entry['published'] = entry['updated']
+    entry.setdefault('title', '')
+    return entry
+
+def _read_feed_field(feed, element):
+    namespace, name = _split(element.tag)
+    if name == 'ttl':
+        feed['ttl'] = _text(element)
+    elif namespace == SY_NS and name in ('updatePeriod', 'updateFrequency'):
+        feed['sy_' + name.lower()] = _text(element)
+    elif name in ('title', 'subtitle', 'description', 'updated') and name not in feed:
+        feed[name] = _text(element)
+
+class FeedStream:
+    """Incremental RSS/Atom parser that yields entries as the body arrives.
+
+    Parsing stops after limit entries, or at the first entry whose GUID is in
+    known_guids (it and everything after it were seen on an earlier refresh),
+    so a refresh only reads, decodes and builds objects for the new items at
+    the top of the feed. Finished items are detached from the tree as they
+    are yielded. Anything the pull parser cannot handle raises
+    FeedStreamError; raw holds every byte read so the caller can fall back to
+    a full parse.
+    """
+
+    def __init__(self, chunks, encoding='utf-8', limit=None, known_guids=None):
+        self.chunks = chunks
+        self.encoding = encoding
+        self.limit = limit
+        self.known_guids = known_guids or frozenset()
+        self.feed = {}
+        self.raw = []
+        self.stopped_at_known = False
+        self.complete = False
+        # Time spent waiting on the body and decoding it; the rest is parsing.
+        self.read_secs = 0.0
+        self.decode_secs = 0.0
+
+    @property
+    def bytes_read(self):
+        return sum(map(len, self.raw))
+
+    def _texts(self):
+        try:
+            decoder = codecs.getincrementaldecoder(self.encoding)(errors='replace')
+        except LookupError:
+            raise FeedStreamError(f"Unsupported encoding: {self.encoding}")
+        chunks = iter(self.chunks)
+        while True:
+            started = time.perf_counter()
+            chunk = next(chunks, None)
+            read = time.perf_counter()
+            self.read_secs += read - started
+            if chunk is None:
+                break
+            self.raw.append(chunk)
+            text = decoder.decode(chunk)
+            self.decode_secs += time.perf_counter() - read
+            yield text
+        yield decoder.decode(b'', final=True)
+
+    def __iter__(self):
+        parser = ET.XMLPullParser(events=('start', 'end'))
+        stack = []
+        count = 0
+        try:
+            # Feeding text rather than bytes makes expat use the charset we
+            # resolved instead of the document's own (possibly wrong) declaration.
+            for text in self._texts():
+                parser.feed(text)
+                for event, element in parser.read_events():
+                    if event == 'start':
+                        if not stack and _split(element.tag)[1] not in FEED_TAGS:
+                            raise FeedStreamError(f"Not an RSS or Atom document: {element.tag}")
+                        stack.append(element)
+                        continue
+                    stack.pop()
+                    if _split(element.tag)[1] not in ENTRY_TAGS:
+                        if stack and _split(stack[-1].tag)[1] in ('channel', 'feed'):
+                            _read_feed_field(self.feed, element)
+                        continue
+                    entry = _read_entry(element)
+                    if stack:
+                        stack[-1].remove(element)
+                    if entry_guid(entry) in self.known_guids:
+                        self.stopped_at_known = True
+                        return
+                    yield entry
+                    count += 1
+                    if self.limit and count >= self.limit:
+                        return
+            parser.close()
+        except ET.ParseError as e:
+            raise FeedStreamError(str(e))
+        self.complete = True
+
+    def read_all(self, rest=()):
+        """Every raw byte read so far plus rest, for a fallback full parse."""
+        return b''.join(self.raw) + b''.join(rest)
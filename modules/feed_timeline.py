@@ -0,0 +1,62 @@
+# modules/feed_timeline.py
+
+import heapq
+from modules.entry_sorting import SORT_KEYS
+
+_date_key = SORT_KEYS['date']
+
+class TimelinePage:
+    def __init__(self, items, cursor):
+        self.items = items
+        self.cursor = cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+def make_cursor(feed_url, entry):
+    epoch, title_key, guid = _date_key(entry)
+    return (epoch, title_key, guid, feed_url)
+
+def _bisect(ordered, key, right):
+    low, high = 0, len(ordered)
+    while low < high:
+        middle = (low + high) // 2
+        middle_key = _date_key(ordered[middle])
+        if middle_key < key or (right and middle_key == key):
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+def _stream(feed_url, ordered, cursor):
+    """Newest-first iterator over one feed's ascending list, starting after cursor."""
+    end = len(ordered)
+    if cursor is not None:
+        epoch, title_key, guid, cursor_feed = cursor
+        # Timeline order is (epoch, title_key, guid, feed_url) descending, so on
+        # an exact (epoch, title, guid) tie only feeds sorting before the
+        # cursor's feed still have that entry ahead of the cursor.
+        end = _bisect(ordered, (epoch, title_key, guid), right=feed_url < cursor_feed)
+    for index in range(end - 1, -1, -1):
+        entry = ordered[index]
+        epoch, title_key, guid = _date_key(entry)
+        yield (epoch, title_key, guid, feed_url, index, entry)
+
+def merge_timeline(streams, limit=50, cursor=None):
+    """k-way merge of per-feed date-sorted lists into one newest-first page.
+
+    streams maps feed URL to that feed's entries in ascending date order. Only
+    the first entry of each feed and the entries actually returned are ever
+    touched, so a page costs O(k + limit log k) regardless of feed sizes.
+    """
+    heads = [_stream(feed_url, ordered, cursor) for feed_url, ordered in streams.items() if ordered]
+    items = []
+    for epoch, title_key, guid, feed_url, _, entry in heapq.merge(*heads, reverse=True):
+        items.append((feed_url, entry))
+        if len(items) >= limit:
+            break
+    next_cursor = make_cursor(*items[-1]) if len(items) >= limit else None
+    return TimelinePage(items, next_cursor)
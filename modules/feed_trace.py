@@ -0,0 +1,221 @@
+# modules/feed_trace.py
+
+import cProfile
+import functools
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from modules.logging.logger import setup_logger
+
+logger = setup_logger('feed_trace')
+
+# Setting these to a file path turns tracing / refresh profiling on at startup.
+TRACE_ENV = 'RSS_TRACE'
+PROFILE_ENV = 'RSS_PROFILE'
+# From 3.12 cProfile sits on sys.monitoring: one enabled profile records every
+# thread, and enabling a second one while it runs raises ValueError.
+PROFILES_ALL_THREADS = sys.version_info >= (3, 12)
+# Oldest spans are dropped past this, so tracing can be left on in a long session.
+MAX_EVENTS = 200_000
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'category', 'args', 'started')
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def set(self, **args):
+        self.args.update(args)
+
+    def __enter__(self):
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.record(self.name, self.category, self.started, time.perf_counter_ns(), self.args)
+        return False
+
+class _NullSpan:
+    __slots__ = ()
+
+    def set(self, **args):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class Tracer:
+    """Collects timed spans as Chrome trace events (chrome://tracing, Perfetto).
+
+    While disabled, span() hands back a shared no-op context manager, so the
+    instrumentation can stay in place on hot paths.
+    """
+
+    def __init__(self, max_events=MAX_EVENTS):
+        self.enabled = False
+        self.events = deque(maxlen=max_events)
+        self.threads = {}
+        self.pid = os.getpid()
+        self.origin = time.perf_counter_ns()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        self.events.clear()
+
+    def span(self, name, category='reader', **args):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category, args)
+
+    def record(self, name, category, started_ns, ended_ns, args=None):
+        thread = threading.current_thread()
+        self.threads.setdefault(thread.ident, thread.name)
+        # deque.append is atomic, so worker threads need no lock here.
+        self.events.append((name, category, started_ns, ended_ns, thread.ident, args))
+
+    def to_chrome_trace(self):
+        events = [{'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': tid, 'args': {'name': name}}
+                  for tid, name in list(self.threads.items())]
+        for name, category, started_ns, ended_ns, tid, args in list(self.events):
+            event = {
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': (started_ns - self.origin) / 1000,
+                'dur': (ended_ns - started_ns) / 1000,
+                'pid': self.pid,
+                'tid': tid,
+            }
+            if args:
+                event['args'] = {key: value if isinstance(value, (int, float, bool)) or value is None else str(value)
+                                 for key, value in args.items()}
+            events.append(event)
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write(self, path):
+        trace = self.to_chrome_trace()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(trace, f)
+        logger.info("Wrote %s trace events to %s", len(trace['traceEvents']), path)
+        return path
+
+tracer = Tracer()
+
+def span(name, category='reader', **args):
+    return tracer.span(name, category, **args)
+
+def traced(name=None, category='reader'):
+    """Decorator form of span(); the span is named after the function by default."""
+    def decorate(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with _Span(tracer, span_name, category, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+class RefreshProfiler:
+    """cProfile over refresh cycles, including the pool threads they fan out to.
+
+    Before 3.12 cProfile only sees the thread it was enabled in, so the calling
+    thread and every task passed through wrap() get their own profile; all of
+    them are merged into one pstats file, accumulated across cycles. From 3.12
+    the cycle's profile already sees the pool threads and wrap() is a no-op.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.stats = None
+        self.cycles = 0
+
+    def _add(self, profile):
+        with self.lock:
+            if self.stats is None:
+                self.stats = pstats.Stats(profile)
+            else:
+                self.stats.add(profile)
+
+    def wrap(self, func):
+        if PROFILES_ALL_THREADS:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profile = cProfile.Profile()
+            try:
+                return profile.runcall(func, *args, **kwargs)
+            finally:
+                self._add(profile)
+        return wrapper
+
+    @contextmanager
+    def cycle(self):
+        global _active_profiler
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Another cycle (or profiler) is already running in this process.
+            logger.warning("Not profiling this refresh cycle: %s", e)
+            profile = None
+        if profile is None:
+            yield self
+            return
+        _active_profiler = self
+        try:
+            yield self
+        finally:
+            profile.disable()
+            _active_profiler = None
+            self._add(profile)
+            self.cycles += 1
+            self.dump()
+
+    def dump(self):
+        with self.lock:
+            if self.stats is None:
+                return None
+            self.stats.dump_stats(self.path)
+        logger.info("Wrote refresh profile (%s cycles) to %s", self.cycles, self.path)
+        return self.path
+
+_active_profiler = None
+
+def profiled(task):
+    """task, wrapped for the refresh cycle currently being profiled, if any."""
+    profiler = _active_profiler
+    return profiler.wrap(task) if profiler else task
+
+def enable_from_env():
+    """Turns tracing on when RSS_TRACE is set; returns the trace path and the
+    refresh profiler for RSS_PROFILE, either of which may be None."""
+    trace_path = os.environ.get(TRACE_ENV)
+    if trace_path:
+        tracer.enable()
+    profile_path = os.environ.get(PROFILE_ENV)
+    return trace_path, RefreshProfiler(profile_path) if profile_path else None
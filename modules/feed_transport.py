@@ -0,0 +1,106 @@
+# modules/feed_transport.py
+
+import socket
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from modules.logging.logger import setup_logger
+
+logger = setup_logger('feed_transport')
+
+DEFAULT_USER_AGENT = "RSSFeedReaderUI/1.0 (+https://github.com/DigitalHallucinations/RSSFeedReaderUI)"
+
+# Connect time of the current thread's request. urllib3 resolves the host
+# inside create_connection, so DNS lookup time is part of this figure.
+_connect_timing = threading.local()
+# Socket the current thread's response is read from, so abort() can reach it.
+_response_socket = threading.local()
+
+class _TimedConnect:
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_timing.secs = (getattr(_connect_timing, 'secs', None) or 0.0) + time.perf_counter() - started
+
+    def getresponse(self, *args, **kwargs):
+        _response_socket.sock = self.sock
+        return super().getresponse(*args, **kwargs)
+
+class TimedHTTPConnection(_TimedConnect, HTTPConnection):
+    pass
+
+class TimedHTTPSConnection(_TimedConnect, HTTPSConnection):
+    pass
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled connections time their (DNS + TCP + TLS) connect."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': TimedHTTPConnectionPool, 'https': TimedHTTPSConnectionPool}
+
+class FeedTransport:
+    """Shared keep-alive HTTP session used for every feed request.
+
+    requests keeps one urllib3 connection pool per host; pool_connections is
+    how many host pools are cached and pool_maxsize how many idle connections
+    each host pool keeps, so it should be at least the per-host refresh cap.
+    """
+
+    def __init__(self, connect_timeout=5.0, read_timeout=30.0, user_agent=DEFAULT_USER_AGENT,
+                 pool_connections=64, pool_maxsize=8, max_retries=1):
+        self.timeout = (connect_timeout, read_timeout)
+        self.user_agent = user_agent
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': user_agent,
+            'Accept': 'application/rss+xml, application/atom+xml, application/rdf+xml, application/xml;q=0.9, text/xml;q=0.9, */*;q=0.8',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+        })
+        adapter = TimedHTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                   max_retries=max_retries, pool_block=False)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        logger.info("HTTP transport ready: %s host pools, %s connections per host", pool_connections, pool_maxsize)
+
+    def get(self, url, headers=None, **kwargs):
+        """session.get, plus response.connect_secs: None when a pooled connection was reused."""
+        kwargs.setdefault('timeout', self.timeout)
+        _connect_timing.secs = None
+        _response_socket.sock = None
+        response = self.session.get(url, headers=headers, **kwargs)
+        response.connect_secs = _connect_timing.secs
+        response.sock = _response_socket.sock
+        return response
+
+    @staticmethod
+    def abort(response):
+        """Cuts off a streamed response from any thread.
+
+        response.close() waits for a read in progress, which can block for the
+        whole read timeout on a slow host; shutting the socket down wakes that
+        read at once. It then fails or sees a truncated body, so the reader has
+        to check its own cancel flag before using what it read.
+        """
+        sock = getattr(response, 'sock', None)
+        if sock is None:
+            return
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,72 @@
+# modules/feed_worker.py
+
+from contextlib import nullcontext
+from PySide6 import QtCore as qtc
+from modules.rss_feed_reader import CancelToken, RSSFeedReaderError
+from modules.logging.logger import setup_logger
+
+logger = setup_logger('feed_worker')
+
+class FeedWorkerSignals(qtc.QObject):
+    # Owned by the window, so emissions from pool threads are queued onto the GUI thread.
+    entries_ready = qtc.Signal(int, str, object)
+    failed = qtc.Signal(int, str, str)
+    refreshed = qtc.Signal(object)
+
+# Workers are plain objects handed to QThreadPool.start() as callables, which
+# keeps their lifetime on the Python side instead of sharing it with a QRunnable.
+class FeedFetchWorker:
+    def __init__(self, signals, request_id, reader, feed_url, sorting):
+        self.signals = signals
+        self.request_id = request_id
+        self.reader = reader
+        self.feed_url = feed_url
+        self.sorting = dict(sorting)
+        self.cancelled = CancelToken()
+
+    def cancel(self):
+        # Aborts the download in flight as well as dropping the results, so a
+        # slow host does not keep holding a pool thread.
+        self.cancelled.cancel()
+
+    def run(self):
+        if self.cancelled.is_set():
+            return
+        try:
+            # A fresh list in the requested order; the cached containers are shared with other workers.
+            entries = self.reader.get_sorted_entries(self.feed_url, self.sorting, cancel=self.cancelled)
+            if self.cancelled.is_set():
+                return
+            view = self.reader.get_filtered_view(self.feed_url, entries, self.sorting)
+            if not self.cancelled.is_set():
+                self.signals.entries_ready.emit(self.request_id, self.feed_url, view)
+        except RSSFeedReaderError as e:
+            if not self.cancelled.is_set():
+                self.signals.failed.emit(self.request_id, self.feed_url, str(e))
+        except Exception as e:
+            logger.exception("Unexpected error occurred while fetching RSS feed %s: %s", self.feed_url, e)
+            if not self.cancelled.is_set():
+                self.signals.failed.emit(self.request_id, self.feed_url, "An unexpected error occurred.")
+
+class FeedRefreshWorker:
+    # full refreshes every feed rather than only those due; profiler, when set,
+    # profiles the cycle (see feed_trace.RefreshProfiler); cancelling cancel
+    # aborts the fetches in flight and submits no more.
+    def __init__(self, signals, reader, full=False, profiler=None, cancel=None):
+        self.signals = signals
+        self.reader = reader
+        self.full = full
+        self.profiler = profiler
+        self.cancel = cancel
+
+    def run(self):
+        try:
+            with self.profiler.cycle() if self.profiler else nullcontext():
+                if self.full:
+                    results = self.reader.refresh_all_feeds(cancel=self.cancel)
+                else:
+                    results = self.reader.refresh_due_feeds(cancel=self.cancel)
+        except Exception as e:
+            logger.exception("Unexpected error occurred while refreshing due feeds: %s", e)
+            results = {}
+        self.signals.refreshed.emit(results)
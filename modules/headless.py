@@ -0,0 +1,131 @@
+# modules/headless.py
+#
+# Display-free entry point: refresh, persistence and scheduling from the core
+# modules only. Nothing here (or anything it imports) touches PySide6, and the
+# reader itself is only imported once the command line has been parsed.
+# Run this module rather than rss_feed_reader, which would otherwise be
+# loaded twice: once as __main__ and again by open_reader.
+#
+#   python -m modules.headless refresh [--category C]
+#   python -m modules.headless serve
+
+import argparse
+import logging
+import os
+import signal
+import sys
+import threading
+from contextlib import nullcontext
+from modules.feed_trace import RefreshProfiler, tracer
+from modules.logging.logger import setup_logger, set_logging_level, set_module_level
+
+logger = setup_logger('headless')
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "feeds.db")
+# Upper bound on one idle wait, so new due times are picked up reasonably soon.
+MAX_IDLE_SECS = 60.0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m modules.headless', description="Headless RSS feed refresher")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="feed store path (default: %(default)s)")
+    parser.add_argument('--config', default=None, help="config.ini with [FeedSettings]")
+    parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'])
+    parser.add_argument('--module-level', action='append', metavar='MODULE=LEVEL',
+                        help="per-module log level, e.g. feed_store=DEBUG (repeatable)")
+    parser.add_argument('--workers', type=int, default=None, help="concurrent fetches")
+    parser.add_argument('--per-host', type=int, default=None, help="concurrent fetches per host")
+    parser.add_argument('--trace', metavar='PATH', default=None, help="write a Chrome trace of the run to PATH")
+    parser.add_argument('--profile', metavar='PATH', default=None,
+                        help="cProfile each refresh cycle, merged into a pstats file at PATH")
+    commands = parser.add_subparsers(dest='command', required=True)
+    refresh = commands.add_parser('refresh', help="refresh every enabled feed once and exit")
+    refresh.add_argument('--category', default=None)
+    serve = commands.add_parser('serve', help="keep refreshing feeds as they fall due until interrupted")
+    serve.add_argument('--metrics-port', type=int, default=None,
+                       help="serve Prometheus metrics on 127.0.0.1:PORT/metrics")
+    return parser
+
+def _apply_log_levels(name, module_levels):
+    set_logging_level(getattr(logging, name))
+    for item in module_levels or ():
+        module, _, level = item.partition('=')
+        set_module_level(module, getattr(logging, level.upper()))
+
+def open_reader(args):
+    from modules.feed_store import FeedStore
+    from modules.rss_feed_reader import RSSFeedReader
+    from modules.settings.feed_config import CONFIG_PATH, read_feed_settings
+
+    feed_settings = read_feed_settings(args.config or CONFIG_PATH)
+    reader = RSSFeedReader(store=FeedStore(args.db))
+    reader.set_refresh_interval(feed_settings['refresh_interval_mins'])
+    reader.set_entries_per_feed(feed_settings['entries_per_feed'])
+    reader.load_feeds()
+    return reader
+
+def close_reader(reader):
+    reader.save_feeds()
+    reader.stop_metrics_server()
+    reader.transport.close()
+    reader.store.close()
+
+def _report(results):
+    failed = [result for result in results.values() if not result.ok]
+    for result in failed:
+        logger.warning("Refresh failed for %s: %s", result.feed_url, result.error)
+    return failed
+
+def _profiling(args):
+    return args.profiler.cycle() if args.profiler else nullcontext()
+
+def run_refresh(reader, args):
+    with _profiling(args):
+        results = reader.refresh_all_feeds(args.category, args.workers, args.per_host)
+    failed = _report(results)
+    print(f"Refreshed {len(results)} feeds, {len(failed)} failed")
+    return 1 if failed and len(failed) == len(results) else 0
+
+def run_serve(reader, args):
+    stop = threading.Event()
+
+    def request_stop(signum, frame):
+        logger.info("Received signal %s, stopping", signum)
+        stop.set()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+    if args.metrics_port is not None:
+        reader.start_metrics_server(args.metrics_port)
+    logger.info("Serving %s RSS feeds", len(reader.feeds))
+    while not stop.is_set():
+        with _profiling(args):
+            results = reader.refresh_due_feeds(args.workers, args.per_host)
+        if results:
+            failed = _report(results)
+            # Each fetched feed's row (etag, last_modified) is already saved with its entries.
+            logger.info("Refreshed %s due RSS feeds, %s failed", len(results), len(failed))
+        wait = reader.scheduler.next_due_in()
+        stop.wait(MAX_IDLE_SECS if wait is None else min(max(wait, 1.0), MAX_IDLE_SECS))
+    return 0
+
+COMMANDS = {
+    'refresh': run_refresh,
+    'serve': run_serve,
+}
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    _apply_log_levels(args.log_level, args.module_level)
+    args.profiler = RefreshProfiler(args.profile) if args.profile else None
+    if args.trace:
+        tracer.enable()
+    reader = open_reader(args)
+    try:
+        return COMMANDS[args.command](reader, args)
+    finally:
+        close_reader(reader)
+        if args.trace:
+            tracer.write(args.trace)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,33 +1,133 @@
 # modules/logging/logger.py
 
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_PATH = 'RSS.log'
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Per-module overrides from the environment, e.g. RSS_LOG_LEVELS="feed_store=DEBUG,rss_feed_reader=WARNING".
+LOG_LEVELS_ENV = 'RSS_LOG_LEVELS'
+# Below WARNING, each message template may be logged this many times per interval;
+# the rest are dropped and counted.
+RATE_LIMIT_BURST = 100
+RATE_LIMIT_INTERVAL = 1.0
 
 logging_level = logging.INFO
+module_levels = {}
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+def _parse_levels(spec):
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, _, level = item.partition('=')
+        level = logging.getLevelName(level.strip().upper())
+        if isinstance(level, int):
+            levels[name.strip()] = level
+    return levels
+
+module_levels.update(_parse_levels(os.environ.get(LOG_LEVELS_ENV, '')))
+
+def _custom_loggers():
+    return [logger for logger in list(logging.Logger.manager.loggerDict.values()) if isinstance(logger, CustomLogger)]
 
 def set_logging_level(level):
+    """Sets the default level, including on loggers that already exist, except
+    those with a per-module level."""
     global logging_level
     logging_level = level
+    for logger in _custom_loggers():
+        if logger.name not in module_levels:
+            logger.setLevel(level)
 
 def get_logging_level():
     return logging_level
 
-class CustomLogger(logging.Logger):
-    def __init__(self, name):
-        super().__init__(name, logging_level)
+def set_module_level(logger_name, level):
+    module_levels[logger_name] = level
+    logging.getLogger(logger_name).setLevel(level)
 
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+def set_rate_limit(burst, interval=RATE_LIMIT_INTERVAL):
+    """burst=None turns rate limiting off."""
+    rate_limit = _get_pipeline().rate_limit
+    rate_limit.burst, rate_limit.interval = burst, interval
 
-        file_handler = RotatingFileHandler('RSS.log', maxBytes=10*1024*1024, backupCount=5, encoding='utf-8')
-        file_handler.setFormatter(formatter)
-        self.addHandler(file_handler)
+class RateLimitFilter(logging.Filter):
+    """Throttles INFO/DEBUG records per message template.
+
+    Messages are logged %-style, so record.msg is the unformatted template and
+    every per-entry message shares one key. The first record let through after
+    a suppressed run reports how many were dropped.
+    """
+
+    def __init__(self, burst=RATE_LIMIT_BURST, interval=RATE_LIMIT_INTERVAL):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.windows = {}
 
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.burst is None:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self.lock:
+            started, count, suppressed = self.windows.get(key, (now, 0, 0))
+            if now - started >= self.interval:
+                started, count = now, 0
+            if count >= self.burst:
+                self.windows[key] = (started, count, suppressed + 1)
+                return False
+            self.windows[key] = (started, count + 1, 0)
+        if suppressed:
+            record.msg = f"{record.msg} ({suppressed} similar messages suppressed)"
+        return True
+
+class _LogPipeline:
+    """One file handler and one stream handler, fed from a queue by a listener
+    thread, so logging calls never wait on disk or console I/O."""
+
+    def __init__(self):
+        formatter = logging.Formatter(LOG_FORMAT)
+        file_handler = RotatingFileHandler(LOG_PATH, maxBytes=10*1024*1024, backupCount=5, encoding='utf-8')
+        file_handler.setFormatter(formatter)
         stream_handler = logging.StreamHandler()
         stream_handler.setFormatter(formatter)
-        self.addHandler(stream_handler)
+        self.queue = queue.SimpleQueue()
+        self.handler = QueueHandler(self.queue)
+        self.rate_limit = RateLimitFilter()
+        self.listener = QueueListener(self.queue, file_handler, stream_handler)
+        self.listener.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        # Drains the queue, then closes the handlers.
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+def _get_pipeline():
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = _LogPipeline()
+        return _pipeline
+
+class CustomLogger(logging.Logger):
+    def __init__(self, name):
+        super().__init__(name, module_levels.get(name, logging_level))
+        pipeline = _get_pipeline()
+        self.addHandler(pipeline.handler)
+        self.addFilter(pipeline.rate_limit)
 
 def setup_logger(logger_name):
     logging.setLoggerClass(CustomLogger)
     logger = logging.getLogger(logger_name)
-    logger.setLevel(logging_level)
-    return logger
\ No newline at end of file
+    logger.setLevel(module_levels.get(logger_name, logging_level))
+    return logger
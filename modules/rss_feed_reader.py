@@ -1,9 +1,27 @@
 # modules/rss_feed_reader.py
 
-import feedparser
-import chardet
-import requests
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
+from itertools import chain
 from urllib.parse import urlparse
+from modules.entry_cache import EntryCache
+from modules.entry_dedup import DuplicateIndex
+from modules.entry_filter import compile_filter, FilteredView
+from modules.entry_sorting import SORT_KEYS, SortedEntries, ensure_sort_keys, is_descending
+from modules.feed_entry import from_row, to_feed_entries
+from modules.feed_charset import resolve_charset, content_type_with_charset
+from modules.feed_metrics import MetricsRegistry, MetricsServer
+from modules.feed_opml import OpmlError, OpmlImportResult, iter_opml, write_opml
+from modules.feed_registry import FeedRegistry
+from modules.feed_scheduler import FeedScheduler
+from modules.feed_store import FeedStore, entry_guid
+from modules.feed_stream import CHUNK_SIZE, FeedStream, FeedStreamError
+from modules.feed_timeline import merge_timeline
+from modules.feed_trace import profiled, span, traced
+from modules.feed_transport import FeedTransport
 from modules.logging.logger import setup_logger
 
 logger = setup_logger('rss_feed_reader')
@@ -11,118 +29,593 @@ logger = setup_logger('rss_feed_reader')
 class RSSFeedReaderError(Exception):
     pass
 
+class FetchCancelled(RSSFeedReaderError):
+    pass
+
+class CancelToken:
+    """Cancels fetches from another thread.
+
+    cancel() aborts every response the fetches sharing this token are
+    streaming, so a read blocked on a slow host returns at once; the fetch
+    then raises FetchCancelled instead of caching or storing what it read.
+    """
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._responses = set()
+
+    def is_set(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        with self._lock:
+            self._cancelled.set()
+            responses = list(self._responses)
+        for response in responses:
+            FeedTransport.abort(response)
+
+    def check(self, feed_url):
+        if self._cancelled.is_set():
+            raise FetchCancelled(f"Fetch of RSS feed cancelled: {feed_url}")
+
+    def attach(self, response):
+        with self._lock:
+            self._responses.add(response)
+            cancelled = self._cancelled.is_set()
+        if cancelled:
+            FeedTransport.abort(response)
+
+    def detach(self, response):
+        with self._lock:
+            self._responses.discard(response)
+
+    def guard(self, chunks, feed_url):
+        for chunk in chunks:
+            self.check(feed_url)
+            yield chunk
+
 class RSSFeed:
     def __init__(self, url, category=None, enabled=True):
         self.url = url
         self.category = category
         self.enabled = enabled
+        # HTTP validators from the last successful fetch, sent back as
+        # If-None-Match / If-Modified-Since so unchanged feeds answer 304.
+        self.etag = None
+        self.last_modified = None
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def update_validators(self, response, not_modified=False):
+        """Takes the response's validators; returns whether they changed.
+
+        A 304 carries the ETag the 200 would have had (RFC 9110 15.4.5) but
+        may leave out Last-Modified, so on a 304 missing headers keep their
+        current value.
+        """
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not_modified:
+            etag = etag or self.etag
+            last_modified = last_modified or self.last_modified
+        changed = (etag, last_modified) != (self.etag, self.last_modified)
+        self.etag, self.last_modified = etag, last_modified
+        return changed
+
+class FeedRefreshResult:
+    def __init__(self, feed_url, entries=None, error=None, elapsed=0.0):
+        self.feed_url = feed_url
+        self.entries = entries
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return self.error is None
 
 class RSSFeedReader:
-    def __init__(self):
-        self.feeds = []
+    def __init__(self, max_workers=16, max_per_host=4, transport=None, entry_cache=None, store=None, scheduler=None,
+                 metrics=True):
+        self.feeds = FeedRegistry()
+        self.store = store
+        self.max_workers = max_workers
+        self.max_per_host = max_per_host
+        self.transport = transport or FeedTransport(pool_maxsize=max_per_host)
+        self.entry_cache = entry_cache if entry_cache is not None else EntryCache()
+        self.scheduler = scheduler if scheduler is not None else FeedScheduler()
+        self.entry_filter = compile_filter(None)
+        self.duplicates = DuplicateIndex(store if store is not None else FeedStore(':memory:'))
+        self.entries_per_feed = None
+        self.metrics = MetricsRegistry() if metrics else None
+        self.metrics_server = None
+
+    def set_refresh_interval(self, refresh_interval_mins):
+        self.entry_cache.ttl_secs = refresh_interval_mins * 60
+        self.scheduler.base_interval_secs = refresh_interval_mins * 60
+
+    def set_entries_per_feed(self, entries_per_feed):
+        entries_per_feed = entries_per_feed or None
+        if entries_per_feed != self.entries_per_feed:
+            self.entries_per_feed = entries_per_feed
+            # Cached lists were cut at the old limit, so refetch them in full.
+            self.entry_cache.invalidate()
 
     def is_valid_feed_url(self, feed_url):
         try:
             parsed_url = urlparse(feed_url)
             return parsed_url.scheme and parsed_url.netloc
         except Exception as e:
-            logger.exception(f"Error occurred while validating feed URL: {str(e)}")
+            logger.exception("Error occurred while validating feed URL: %s", e)
             return False
 
     def add_feed(self, feed_url, category=None):
-        logger.info(f"Adding RSS feed: {feed_url}")
+        logger.info("Adding RSS feed: %s", feed_url)
         if not self.is_valid_feed_url(feed_url):
-            logger.warning(f"Invalid feed URL: {feed_url}")
+            logger.warning("Invalid feed URL: %s", feed_url)
             raise RSSFeedReaderError(f"Invalid feed URL: {feed_url}. Please provide a valid RSS feed URL.")
+        if feed_url in self.feeds:
+            logger.warning("RSS feed already added: %s", feed_url)
+            raise RSSFeedReaderError(f"Already subscribed to RSS feed: {feed_url}.")
         try:
             feed = RSSFeed(feed_url, category)
-            self.feeds.append(feed)
-            logger.info(f"RSS feed added successfully: {feed_url}")
+            if self.store:
+                self.store.save_feed(feed)
+            self.feeds.add(feed)
+            self._schedule(feed)
+            logger.info("RSS feed added successfully: %s", feed_url)
         except Exception as e:
-            logger.exception(f"Error occurred while adding RSS feed: {str(e)}")
+            logger.exception("Error occurred while adding RSS feed: %s", e)
             raise RSSFeedReaderError(f"Failed to add RSS feed: {feed_url}. Please check the URL and try again.")
 
+    def add_feeds(self, feeds):
+        """Adds (url, category) pairs in bulk and persists them in one transaction.
+
+        Invalid and already subscribed URLs are skipped; returns the added feeds.
+        """
+        new_feeds = {}
+        for feed_url, category in feeds:
+            if feed_url in self.feeds or feed_url in new_feeds:
+                continue
+            if not self.is_valid_feed_url(feed_url):
+                logger.warning("Skipping invalid feed URL: %s", feed_url)
+                continue
+            new_feeds[feed_url] = RSSFeed(feed_url, category)
+        logger.info("Adding %s RSS feeds", len(new_feeds))
+        try:
+            if self.store:
+                self.store.save_feeds(new_feeds.values())
+            added = self.feeds.add_many(new_feeds.values())
+            for feed in added:
+                self._schedule(feed)
+            return added
+        except Exception as e:
+            logger.exception("Error occurred while adding RSS feeds: %s", e)
+            raise RSSFeedReaderError(f"Failed to add {len(new_feeds)} RSS feeds. An unexpected error occurred.")
+
+    def update_feeds(self, feed_urls, category=None, enabled=None):
+        """Applies the same category/enabled change to many feeds in one transaction."""
+        logger.info("Updating %s RSS feeds", len(feed_urls))
+        try:
+            updated = self.feeds.update_many(feed_urls, category, enabled)
+            if self.store:
+                self.store.save_feeds(updated)
+            for feed in updated:
+                self._schedule(feed)
+            return updated
+        except Exception as e:
+            logger.exception("Error occurred while updating RSS feeds: %s", e)
+            raise RSSFeedReaderError(f"Failed to update {len(feed_urls)} RSS feeds. An unexpected error occurred.")
+
+    def remove_feeds(self, feed_urls):
+        """Removes many feeds and their stored entries in one transaction."""
+        logger.info("Removing %s RSS feeds", len(feed_urls))
+        try:
+            removed = self.feeds.remove_many(feed_urls)
+            for feed in removed:
+                self.entry_cache.invalidate(feed.url)
+                self.scheduler.remove(feed.url)
+                if self.metrics:
+                    self.metrics.remove(feed.url)
+            if self.store:
+                self.store.delete_feeds([feed.url for feed in removed])
+            return removed
+        except Exception as e:
+            logger.exception("Error occurred while removing RSS feeds: %s", e)
+            raise RSSFeedReaderError(f"Failed to remove {len(feed_urls)} RSS feeds. An unexpected error occurred.")
+
     def remove_entry(self, feed_url, entry_title):
-        for feed in self.feeds:
-            if feed.url == feed_url:
-                feed.entries = [entry for entry in feed.entries if entry.title != entry_title]
-                break
+        self.entry_cache.remove_entry(feed_url, entry_title)
+        if self.store:
+            self.store.delete_entry(feed_url, entry_title)
 
     def remove_feed(self, feed_url):
-        logger.info(f"Removing RSS feed: {feed_url}")
+        logger.info("Removing RSS feed: %s", feed_url)
         try:
-            self.feeds = [feed for feed in self.feeds if feed.url != feed_url]
-            logger.info(f"RSS feed removed successfully: {feed_url}")
+            self.feeds.remove(feed_url)
+            self.entry_cache.invalidate(feed_url)
+            self.scheduler.remove(feed_url)
+            if self.metrics:
+                self.metrics.remove(feed_url)
+            if self.store:
+                self.store.delete_feed(feed_url)
+            logger.info("RSS feed removed successfully: %s", feed_url)
         except Exception as e:
-            logger.exception(f"Error occurred while removing RSS feed: {str(e)}")
+            logger.exception("Error occurred while removing RSS feed: %s", e)
             raise RSSFeedReaderError(f"Failed to remove RSS feed: {feed_url}. An unexpected error occurred.")
 
+    def _schedule(self, feed):
+        # Only enabled feeds are polled; disabling one takes it off the schedule.
+        if not feed.enabled:
+            self.scheduler.remove(feed.url)
+        elif feed.url not in self.scheduler:
+            self.scheduler.add(feed.url)
+
+    def _is_enabled(self, feed_url):
+        feed = self.feeds.get(feed_url)
+        return feed is not None and feed.enabled
+
     def get_feeds(self, category=None, enabled=True):
         logger.info("Retrieving RSS feeds")
-        if category:
-            feeds = [feed for feed in self.feeds if feed.category == category and feed.enabled == enabled]
-        else:
-            feeds = [feed for feed in self.feeds if feed.enabled == enabled]
-        return feeds
+        return self.feeds.get_feeds(category, enabled)
 
     def update_feed(self, feed_url, category=None, enabled=None):
-        logger.info(f"Updating RSS feed: {feed_url}")
+        logger.info("Updating RSS feed: %s", feed_url)
         try:
-            feed = next((feed for feed in self.feeds if feed.url == feed_url), None)
+            feed = self.feeds.update(feed_url, category, enabled)
             if feed:
-                if category is not None:
-                    feed.category = category
-                if enabled is not None:
-                    feed.enabled = enabled
-                logger.info(f"RSS feed updated successfully: {feed_url}")
+                if self.store:
+                    self.store.save_feed(feed)
+                self._schedule(feed)
+                logger.info("RSS feed updated successfully: %s", feed_url)
             else:
-                logger.warning(f"RSS feed not found: {feed_url}")
+                logger.warning("RSS feed not found: %s", feed_url)
                 raise RSSFeedReaderError(f"RSS feed not found: {feed_url}. Please provide a valid feed URL.")
         except Exception as e:
-            logger.exception(f"Error occurred while updating RSS feed: {str(e)}")
+            logger.exception("Error occurred while updating RSS feed: %s", e)
             raise RSSFeedReaderError(f"Failed to update RSS feed: {feed_url}. An unexpected error occurred.")
 
     def parse_feed(self, feed_url):
-        logger.info(f"Parsing RSS feed: {feed_url}")
+        logger.info("Parsing RSS feed: %s", feed_url)
         try:
-            feed = feedparser.parse(feed_url)
+            import feedparser
+            response = self.transport.get(feed_url)
+            feed = feedparser.parse(response.content, response_headers=self._parser_headers(feed_url, response))
             if feed.bozo:
-                logger.warning(f"Error parsing RSS feed: {feed.bozo_exception}")
+                logger.warning("Error parsing RSS feed: %s", feed.bozo_exception)
                 raise RSSFeedReaderError(f"Failed to parse RSS feed: {feed_url}. Please check the feed format and try again.")
             else:
-                logger.info(f"RSS feed parsed successfully: {feed_url}")
+                logger.info("RSS feed parsed successfully: %s", feed_url)
                 return feed
         except Exception as e:
-            logger.exception(f"Error occurred while parsing RSS feed: {str(e)}")
+            logger.exception("Error occurred while parsing RSS feed: %s", e)
             raise RSSFeedReaderError(f"Failed to parse RSS feed: {feed_url}. An unexpected error occurred.")
 
-    def get_feed_entries(self, feed_url):
-        logger.info(f"Retrieving entries from RSS feed: {feed_url}")
+    def get_feed(self, feed_url):
+        return self.feeds.get(feed_url)
+
+    def _parser_headers(self, feed_url, response, content=None):
+        # The transport has already undone Content-Encoding, so feedparser only
+        # gets the raw bytes plus the resolved charset and base URI; it decodes
+        # once and never needs to run chardet over the whole body itself.
+        content_type = response.headers.get('Content-Type')
+        encoding, source = resolve_charset(content_type, response.content if content is None else content)
+        logger.debug("Resolved charset %s from %s for RSS feed: %s", encoding, source, feed_url)
+        return {
+            'content-location': response.url or feed_url,
+            'content-type': content_type_with_charset(content_type, encoding),
+        }
+
+    def get_feed_entries(self, feed_url, force_refresh=False, cancel=None):
+        # cancel: a CancelToken; cancelling it makes this raise FetchCancelled.
+        if not force_refresh:
+            entries = self.entry_cache.get(feed_url)
+            if entries is not None:
+                return entries
+
+        logger.info("Retrieving entries from RSS feed: %s", feed_url)
+        response = None
         try:
-            response = requests.get(feed_url)
-            
-            encoding = chardet.detect(response.content)['encoding']
-            
-            content = response.content.decode(encoding)
+            rss_feed = self.get_feed(feed_url)
+            cached_entries = self.entry_cache.get_stale(feed_url)
+            if cached_entries is None:
+                cached_entries = self._load_stored_entries(feed_url)
+            headers = rss_feed.conditional_headers() if rss_feed and cached_entries is not None else {}
+            started = time.perf_counter()
+            with span('fetch', url=feed_url) as fetch_span:
+                response = self.transport.get(feed_url, headers=headers, stream=True)
+                fetch_span.set(status=response.status_code)
+            if cancel is not None:
+                cancel.attach(response)
+            timings = {'connect': response.connect_secs, 'ttfb': response.elapsed.total_seconds()}
+            try:
+                if response.status_code == 304 and headers:
+                    logger.info("RSS feed not modified, reusing %s entries: %s", len(cached_entries), feed_url)
+                    self.entry_cache.touch(feed_url)
+                    if rss_feed and rss_feed.update_validators(response, not_modified=True):
+                        self._save_feed(rss_feed)
+                    if feed_url in self.scheduler:
+                        self.scheduler.record_fetch(feed_url, cached_entries, headers=response.headers)
+                    if self.metrics:
+                        self.metrics.record_fetch(feed_url, 304, not_modified=True, total=time.perf_counter() - started, **timings)
+                    return cached_entries
+                with span('parse', url=feed_url):
+                    feed_info, new_entries, stopped_at_known, stats = self._parse_response(feed_url, response, cached_entries,
+                                                                                           cancel)
+            finally:
+                if cancel is not None:
+                    cancel.detach(response)
+                response.close()
+            if cancel is not None:
+                # An aborted read looks like the end of the body; drop what was parsed.
+                cancel.check(feed_url)
 
-            feed = feedparser.parse(content)
-            
-            if feed.bozo:
-                logger.warning(f"Error parsing RSS feed: {feed.bozo_exception}")
-                raise RSSFeedReaderError(f"Failed to parse RSS feed: {feed_url}. Please check the feed format and try again.")
-            
-            entries = feed.entries
-            logger.info(f"Retrieved {len(entries)} entries from RSS feed: {feed_url}")
+            new_entries = to_feed_entries(new_entries, feed_url, time.time())
+            with span('dedup', entries=len(new_entries)):
+                duplicates = self.duplicates.assign_entries(new_entries)
+            if duplicates:
+                logger.info("Found %s duplicates of entries from other RSS feeds in: %s", duplicates, feed_url)
+            entries = new_entries
+            if stopped_at_known:
+                # Everything from the first known GUID down is unchanged, so keep
+                # the cached copies instead of parsing them again.
+                new_guids = {entry_guid(entry) for entry in new_entries}
+                entries = new_entries + [entry for entry in cached_entries if entry_guid(entry) not in new_guids]
+                if self.entries_per_feed:
+                    entries = entries[:self.entries_per_feed]
+            self.entry_cache.put(feed_url, entries)
+            if rss_feed:
+                rss_feed.update_validators(response)
+            with span('persist', entries=len(new_entries)):
+                self._persist_entries(rss_feed, feed_url, new_entries)
+            if feed_url in self.scheduler:
+                self.scheduler.record_fetch(feed_url, entries, feed_info, response.headers)
+            if self.metrics:
+                self.metrics.record_fetch(feed_url, response.status_code, stats.pop('nbytes'), len(entries), len(new_entries),
+                                          total=time.perf_counter() - started, **timings, **stats)
+            logger.info("Retrieved %s entries from RSS feed: %s", len(entries), feed_url)
             return entries
+        except FetchCancelled:
+            logger.info("Cancelled fetch of RSS feed: %s", feed_url)
+            raise
         except RSSFeedReaderError as e:
-            logger.exception(f"Error occurred while retrieving entries from RSS feed: {str(e)}")
+            self._raise_if_cancelled(cancel, feed_url)
+            logger.exception("Error occurred while retrieving entries from RSS feed: %s", e)
+            self._record_failure(feed_url, e, response)
             raise e
         except Exception as e:
-            logger.exception(f"Error occurred while retrieving entries from RSS feed: {str(e)}")
+            self._raise_if_cancelled(cancel, feed_url)
+            logger.exception("Error occurred while retrieving entries from RSS feed: %s", e)
+            self._record_failure(feed_url, e, response)
             raise RSSFeedReaderError(f"Failed to retrieve entries from RSS feed: {feed_url}. An unexpected error occurred.")
 
+    @staticmethod
+    def _raise_if_cancelled(cancel, feed_url):
+        # Errors from an aborted connection are the cancellation, not a feed failure.
+        if cancel is not None and cancel.is_set():
+            logger.info("Cancelled fetch of RSS feed: %s", feed_url)
+            raise FetchCancelled(f"Fetch of RSS feed cancelled: {feed_url}")
+
+    def _load_stored_entries(self, feed_url):
+        """Seeds the cache with a feed's stored entries, so the first fetch after
+        startup can be a conditional GET instead of a full download."""
+        if not self.store:
+            return None
+        try:
+            entries = self.get_stored_entries(feed_url, self.entries_per_feed)
+        except Exception as e:
+            logger.exception("Error occurred while loading stored entries for RSS feed %s: %s", feed_url, e)
+            return None
+        if not entries:
+            return None
+        logger.info("Loaded %s stored entries for RSS feed: %s", len(entries), feed_url)
+        self.entry_cache.put(feed_url, entries, stale=True)
+        return entries
+
+    def _parse_response(self, feed_url, response, cached_entries=None, cancel=None):
+        """Streams entries off the response; returns (feed_info, new_entries, stopped_at_known, stats).
+
+        Documents the pull parser cannot handle are read in full and handed to feedparser.
+        """
+        chunks = response.iter_content(CHUNK_SIZE)
+        if cancel is not None:
+            chunks = cancel.guard(chunks, feed_url)
+        first = next(chunks, b'')
+        with span('charset'):
+            encoding, source = resolve_charset(response.headers.get('Content-Type'), first)
+        known_guids = {entry_guid(entry) for entry in cached_entries} if cached_entries else None
+        stream = FeedStream(chain((first,), chunks), encoding, self.entries_per_feed, known_guids)
+        started = time.perf_counter()
+        try:
+            with span('stream') as stream_span:
+                entries = list(stream)
+                stream_span.set(entries=len(entries), bytes=stream.bytes_read)
+            elapsed = time.perf_counter() - started
+            logger.debug("Streamed %s new entries (%s from %s) from RSS feed: %s", len(entries), encoding, source, feed_url)
+            stats = {'nbytes': stream.bytes_read, 'read': stream.read_secs, 'decode': stream.decode_secs,
+                     'parse': max(elapsed - stream.read_secs - stream.decode_secs, 0.0)}
+            return stream.feed, entries, stream.stopped_at_known, stats
+        except FeedStreamError as e:
+            logger.debug("Streaming parse failed, falling back to a full parse of RSS feed %s: %s", feed_url, e)
+        import feedparser
+        read_started = time.perf_counter()
+        content = stream.read_all(chunks) if stream.raw else first + b''.join(chunks)
+        parse_started = time.perf_counter()
+        with span('feedparser.parse', bytes=len(content)):
+            feed = feedparser.parse(content, response_headers=self._parser_headers(feed_url, response, content))
+        # feedparser decodes internally, so its decode time is counted as parse time.
+        stats = {'nbytes': len(content), 'read': stream.read_secs + parse_started - read_started, 'decode': None,
+                 'parse': time.perf_counter() - parse_started}
+        if feed.bozo:
+            logger.warning("Error parsing RSS feed: %s", feed.bozo_exception)
+            raise RSSFeedReaderError(f"Failed to parse RSS feed: {feed_url}. Please check the feed format and try again.")
+        entries = feed.entries[:self.entries_per_feed] if self.entries_per_feed else feed.entries
+        return feed.feed, entries, False, stats
+
+    def import_opml(self, source, probe=False, max_workers=None, max_per_host=None):
+        """Subscribes to every feed in an OPML file in one bulk insert.
+
+        With probe=True each new URL is fetched first (concurrently, capped per
+        host) and only those that answer with a parseable feed are added.
+        """
+        logger.info("Importing OPML: %s", source)
+        try:
+            outlines = list(iter_opml(source))
+        except (OSError, OpmlError) as e:
+            logger.exception("Error occurred while reading OPML: %s", e)
+            raise RSSFeedReaderError(f"Failed to import OPML: {source}. Please check the file and try again.")
+        dead = []
+        if probe:
+            new_urls = list(dict.fromkeys(feed_url for feed_url, _ in outlines
+                                          if feed_url not in self.feeds and self.is_valid_feed_url(feed_url)))
+            started = time.perf_counter()
+            live = self._run_per_host(new_urls, self._probe_feed,
+                                      max_workers or self.max_workers, max_per_host or self.max_per_host)
+            dead = [feed_url for feed_url, ok in live.items() if not ok]
+            outlines = [(feed_url, category) for feed_url, category in outlines if live.get(feed_url)]
+            logger.info("Probed %s RSS feeds (%s dead) in %.2fs", len(new_urls), len(dead), time.perf_counter() - started)
+        added = self.add_feeds(outlines)
+        logger.info("Imported %s RSS feeds from OPML: %s", len(added), source)
+        return OpmlImportResult(added, len(outlines) - len(added), dead)
+
+    def export_opml(self, destination, category=None):
+        feeds = self.get_feeds(category) + self.get_feeds(category, enabled=False)
+        logger.info("Exporting %s RSS feeds to OPML: %s", len(feeds), destination)
+        try:
+            return write_opml(feeds, destination)
+        except OSError as e:
+            logger.exception("Error occurred while exporting OPML: %s", e)
+            raise RSSFeedReaderError(f"Failed to export OPML: {destination}.")
+
+    def _probe_feed(self, feed_url):
+        try:
+            response = self.transport.get(feed_url, stream=True)
+            try:
+                if response.status_code != 200:
+                    return False
+                self._parse_response(feed_url, response)
+                return True
+            finally:
+                response.close()
+        except Exception as e:
+            logger.info("RSS feed probe failed for %s: %s", feed_url, e)
+            return False
+
+    def _record_failure(self, feed_url, error=None, response=None):
+        if feed_url in self.scheduler:
+            self.scheduler.record_failure(feed_url)
+        if self.metrics and error is not None:
+            self.metrics.record_error(feed_url, type(error).__name__, response.status_code if response is not None else None)
+
+    def get_stats(self, feed_url=None):
+        """Fetch counters and latency histograms, for one feed or all of them plus totals."""
+        if not self.metrics:
+            return None
+        return self.metrics.get_stats(feed_url)
+
+    def start_metrics_server(self, port=9464, host='127.0.0.1'):
+        """Exposes get_stats() as Prometheus text at http://host:port/metrics."""
+        if not self.metrics:
+            raise RSSFeedReaderError("Metrics are disabled for this reader.")
+        if self.metrics_server is None:
+            self.metrics_server = MetricsServer(self.metrics, host, port).start()
+        return self.metrics_server
+
+    def stop_metrics_server(self):
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+            self.metrics_server = None
+
+    def _save_feed(self, rss_feed):
+        if not self.store:
+            return
+        try:
+            self.store.save_feed(rss_feed)
+        except Exception as e:
+            logger.exception("Error occurred while saving RSS feed %s: %s", rss_feed.url, e)
+
+    def _persist_entries(self, rss_feed, feed_url, entries):
+        if not self.store:
+            return
+        try:
+            self.store.upsert_entries(feed_url, entries)
+            if rss_feed:
+                self.store.save_feed(rss_feed)
+        except Exception as e:
+            logger.exception("Error occurred while storing entries for RSS feed %s: %s", feed_url, e)
+
+    def load_feeds(self):
+        if not self.store:
+            return 0
+        logger.info("Loading RSS feeds from feed store")
+        for row in self.store.load_feeds():
+            feed = RSSFeed(row['url'], row['category'], bool(row['enabled']))
+            feed.etag = row['etag']
+            feed.last_modified = row['last_modified']
+            self.feeds.add(feed)
+            self._schedule(feed)
+        logger.info("Loaded %s RSS feeds from feed store", len(self.feeds))
+        return len(self.feeds)
+
+    def save_feeds(self):
+        if not self.store:
+            return
+        logger.info("Saving %s RSS feeds to feed store", len(self.feeds))
+        try:
+            self.store.save_feeds(self.feeds)
+        except Exception as e:
+            logger.exception("Error occurred while saving RSS feeds: %s", e)
+            raise RSSFeedReaderError("Failed to save RSS feeds. An unexpected error occurred.")
+
+    def get_stored_entries(self, feed_url, limit=None):
+        if not self.store:
+            return []
+        return [from_row(row, feed_url) for row in self.store.get_entries(feed_url, limit)]
+
+    def get_duplicate_group(self, entry):
+        return entry.get('dup_group')
+
+    def get_duplicates(self, dup_group):
+        """Every stored entry in a duplicate group, across all feeds, oldest first."""
+        if not self.store or not dup_group:
+            return []
+        return [from_row(row) for row in self.store.get_duplicates(dup_group)]
+
+    def search_entries(self, query, limit=100, feed_url=None, order='recent'):
+        logger.info("Searching stored entries for: %s", query)
+        if not self.store:
+            logger.warning("Entry search requires a feed store")
+            return []
+        try:
+            return [from_row(row) for row in self.store.search(query, limit, feed_url, order)]
+        except Exception as e:
+            logger.exception("Error occurred while searching entries: %s", e)
+            raise RSSFeedReaderError(f"Failed to search entries for: {query}. Please check the search syntax.")
+
+    def set_filters(self, filters):
+        self.entry_filter = compile_filter(filters)
+        logger.info("Compiled entry filter: %s keywords, date range %s, categories %s",
+                    len(self.entry_filter.keywords), self.entry_filter.date_key, sorted(self.entry_filter.categories or []))
+        return self.entry_filter
+
+    @traced('filter')
+    def get_filtered_view(self, feed_url, entries, sorting=None):
+        feed = self.get_feed(feed_url)
+        view = FilteredView(entries, feed.category if feed else None, sorting)
+        view.apply(self.entry_filter)
+        return view
+
+    def filter_entries(self, entries, category=None):
+        return [entry for entry in entries if self.entry_filter(entry, category)]
+
     def get_entry_details(self, entry):
-        logger.info(f"Retrieving details for entry: {getattr(entry, 'title', 'N/A')}")
+        logger.debug("Retrieving details for entry: %s", getattr(entry, 'title', 'N/A'))
         try:
             entry_details = {
                 'title': getattr(entry, 'title', ''),
@@ -130,35 +623,123 @@ class RSSFeedReader:
                 'published': getattr(entry, 'published', ''),
                 'summary': getattr(entry, 'summary', '')
             }
-            logger.info(f"Retrieved details for entry: {getattr(entry, 'title', 'N/A')}")
+            logger.debug("Retrieved details for entry: %s", getattr(entry, 'title', 'N/A'))
             return entry_details
         except Exception as e:
-            logger.exception(f"Error occurred while retrieving entry details: {str(e)}")
+            logger.exception("Error occurred while retrieving entry details: %s", e)
             raise RSSFeedReaderError(f"Failed to retrieve details for entry. An unexpected error occurred.")
         
     def get_categories(self):
         logger.info("Retrieving categories from RSS feeds")
         try:
-            categories = set()
-            for feed in self.feeds:
-                if feed.category:
-                    categories.add(feed.category)
-            logger.info(f"Retrieved {len(categories)} categories from RSS feeds")
-            return list(categories)
+            categories = self.feeds.categories()
+            logger.info("Retrieved %s categories from RSS feeds", len(categories))
+            return categories
         except Exception as e:
-            logger.exception(f"Error occurred while retrieving categories: {str(e)}")
+            logger.exception("Error occurred while retrieving categories: %s", e)
             raise RSSFeedReaderError(f"Failed to retrieve categories. An unexpected error occurred.")   
         
     def sort_entries(self, entries, sorting):
-        logger.info(f"Sorting entries based on {sorting['method']} in {sorting['order']} order")
+        logger.info("Sorting entries based on %s in %s order", sorting['method'], sorting['order'])
         try:
-            if sorting['method'] == 'date':
-                entries.sort(key=lambda entry: getattr(entry, 'published_parsed', ''), reverse=(sorting['order'] == 'descending'))
-            elif sorting['method'] == 'title':
-                entries.sort(key=lambda entry: getattr(entry, 'title', ''), reverse=(sorting['order'] == 'descending'))
+            key = SORT_KEYS.get(sorting['method'])
+            if key:
+                ensure_sort_keys(entries)
+                entries.sort(key=key, reverse=is_descending(sorting))
             logger.info("Entries sorted successfully")
             return entries
         except Exception as e:
-            logger.exception(f"Error occurred while sorting entries: {str(e)}")
+            logger.exception("Error occurred while sorting entries: %s", e)
             raise RSSFeedReaderError(f"Failed to sort entries. An unexpected error occurred.")
-    
\ No newline at end of file
+
+    @traced('sort')
+    def get_sorted_entries(self, feed_url, sorting, cancel=None):
+        entries = self.get_feed_entries(feed_url, cancel=cancel)
+        sorted_entries = self.entry_cache.get_sorted(feed_url)
+        if sorted_entries is None:
+            sorted_entries = SortedEntries(list(entries))
+        return sorted_entries.view(sorting)
+
+    def get_timeline(self, limit=50, cursor=None, category=None):
+        """Newest entries across all enabled feeds, a page at a time.
+
+        Pass the returned page's cursor back in to get the next page; the cursor
+        is None once the timeline is exhausted. Feeds not in the entry cache are
+        skipped until they have been fetched.
+        """
+        streams = {}
+        for feed in self.get_feeds(category):
+            sorted_entries = self.entry_cache.get_sorted(feed.url)
+            if sorted_entries is not None:
+                streams[feed.url] = sorted_entries.by_date
+        logger.info("Merging timeline page of %s entries across %s RSS feeds", limit, len(streams))
+        return merge_timeline(streams, limit, cursor)
+
+    def refresh_all_feeds(self, category=None, max_workers=None, max_per_host=None, cancel=None):
+        feed_urls = [feed.url for feed in self.get_feeds(category)]
+        max_workers = max_workers or self.max_workers
+        max_per_host = max_per_host or self.max_per_host
+        logger.info("Refreshing %s RSS feeds with %s workers, %s per host", len(feed_urls), max_workers, max_per_host)
+        started = time.perf_counter()
+        with span('refresh', feeds=len(feed_urls)):
+            results = self._run_per_host(feed_urls, partial(self._refresh_feed, cancel=cancel), max_workers, max_per_host,
+                                         cancel)
+        failed = sum(1 for result in results.values() if not result.ok)
+        logger.info("Refreshed %s RSS feeds (%s failed) in %.2fs", len(results), failed, time.perf_counter() - started)
+        return results
+
+    def refresh_due_feeds(self, max_workers=None, max_per_host=None, cancel=None):
+        feed_urls = [feed_url for feed_url in self.scheduler.pop_due() if self._is_enabled(feed_url)]
+        if not feed_urls:
+            return {}
+        logger.info("Refreshing %s due RSS feeds", len(feed_urls))
+        with span('refresh', feeds=len(feed_urls)):
+            return self._run_per_host(feed_urls, partial(self._refresh_feed, cancel=cancel),
+                                      max_workers or self.max_workers, max_per_host or self.max_per_host, cancel)
+
+    def _refresh_feed(self, feed_url, cancel=None):
+        started = time.perf_counter()
+        try:
+            with span('refresh_feed', url=feed_url):
+                entries = self.get_feed_entries(feed_url, force_refresh=True, cancel=cancel)
+            return FeedRefreshResult(feed_url, entries=entries, elapsed=time.perf_counter() - started)
+        except RSSFeedReaderError as e:
+            return FeedRefreshResult(feed_url, error=e, elapsed=time.perf_counter() - started)
+
+    def _run_per_host(self, urls, task, max_workers, max_per_host, cancel=None):
+        # Work is queued per host and only handed to the pool while the host is
+        # below max_per_host, so one slow host cannot occupy every worker. Once
+        # cancel is set nothing more is submitted; unsubmitted URLs get no result.
+        pending = defaultdict(deque)
+        for url in urls:
+            pending[urlparse(url).netloc.lower()].append(url)
+        active = defaultdict(int)
+        ready = deque(pending)
+        queued = set(pending)
+        in_flight = {}
+        results = {}
+        task = profiled(task)
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='rss-refresh') as executor:
+            while ready or in_flight:
+                while ready and len(in_flight) < max_workers and not (cancel is not None and cancel.is_set()):
+                    host = ready.popleft()
+                    url = pending[host].popleft()
+                    active[host] += 1
+                    in_flight[executor.submit(task, url)] = (host, url)
+                    if pending[host] and active[host] < max_per_host:
+                        ready.append(host)
+                    else:
+                        queued.discard(host)
+
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    host, url = in_flight.pop(future)
+                    active[host] -= 1
+                    results[url] = future.result()
+                    if pending[host] and host not in queued:
+                        ready.append(host)
+                        queued.add(host)
+        return results
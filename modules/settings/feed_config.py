@@ -0,0 +1,20 @@
+# modules/settings/feed_config.py
+
+import configparser
+import os
+
+CONFIG_PATH = os.path.join("modules", "settings", "config.ini")
+
+DEFAULT_ENTRIES_PER_FEED = 10
+DEFAULT_REFRESH_INTERVAL_MINS = 30
+DEFAULT_DISPLAY_FORMAT = "Simple List"
+
+def read_feed_settings(config_path=CONFIG_PATH):
+    """[FeedSettings] from config.ini, without importing any UI code."""
+    config = configparser.ConfigParser()
+    config.read(config_path)
+    return {
+        'entries_per_feed': config.getint("FeedSettings", "entries_per_feed", fallback=DEFAULT_ENTRIES_PER_FEED),
+        'refresh_interval_mins': config.getint("FeedSettings", "refresh_interval_mins", fallback=DEFAULT_REFRESH_INTERVAL_MINS),
+        'display_format': config.get("FeedSettings", "display_format", fallback=DEFAULT_DISPLAY_FORMAT),
+    }
@@ -10,6 +10,28 @@ from modules.logging.logger import setup_logger
 
 logger = setup_logger('filter_sort_settings')
 
+# The date edits' minimum, shown as "Any date" and saved as no bound.
+ANY_DATE = QDate(1970, 1, 1)
+
+def _to_qdate(value):
+    if isinstance(value, datetime):
+        return QDate(value.year, value.month, value.day)
+    date = QDate.fromString(value, "yyyy-MM-dd") if value else QDate()
+    return date if date.isValid() else ANY_DATE
+
+def _date_setting(date_edit):
+    date = date_edit.date()
+    return None if date == ANY_DATE else date.toString("yyyy-MM-dd")
+
+def _date_edit(parent, value, style):
+    date_edit = qtw.QDateEdit(parent)
+    date_edit.setStyleSheet(style)
+    date_edit.setDisplayFormat("yyyy-MM-dd")
+    date_edit.setMinimumDate(ANY_DATE)
+    date_edit.setSpecialValueText("Any date")
+    date_edit.setDate(_to_qdate(value))
+    return date_edit
+
 def load_filter_sort_settings(self): 
     settings_folder = os.path.join("modules", "settings")
     filters_path = os.path.join(settings_folder, "filters.json")
@@ -39,7 +61,7 @@ def load_filter_sort_settings(self):
                 "start": None,
                 "end": None
             },
-            "categories": []
+            "categories": None
         }
         self.sorting = {
             "method": "date",
@@ -66,6 +88,7 @@ def setup_filter_settings_ui(self, window, font_family, font_size, font_color, w
 
     self.keyword_entry = qtw.QLineEdit(window)
     self.keyword_entry.setStyleSheet(f"background-color: {spinbox_bg}; color: {font_color}; font: {font_style};")
+    self.keyword_entry.setText(", ".join(keyword for keyword in self.filters.get("keywords") or [] if keyword))
     layout.addWidget(self.keyword_entry)
 
     date_range_label = qtw.QLabel("Date Range:", window)
@@ -77,12 +100,13 @@ def setup_filter_settings_ui(self, window, font_family, font_size, font_color, w
     date_layout = qtw.QHBoxLayout(date_frame)
     layout.addWidget(date_frame)
 
-    self.start_date_edit = qtw.QDateEdit(date_frame)
-    self.start_date_edit.setStyleSheet(f"background-color: {spinbox_bg}; color: {font_color}; font: {font_style};")
+    # Each edit's minimum date reads "Any date", meaning that end of the range is open.
+    date_range = self.filters.get("date_range") or {}
+    date_style = f"background-color: {spinbox_bg}; color: {font_color}; font: {font_style};"
+    self.start_date_edit = _date_edit(date_frame, date_range.get("start"), date_style)
     date_layout.addWidget(self.start_date_edit)
 
-    self.end_date_edit = qtw.QDateEdit(date_frame)
-    self.end_date_edit.setStyleSheet(f"background-color: {spinbox_bg}; color: {font_color}; font: {font_style};")
+    self.end_date_edit = _date_edit(date_frame, date_range.get("end"), date_style)
     date_layout.addWidget(self.end_date_edit)
 
     category_label = qtw.QLabel("Categories:", window)
@@ -94,8 +118,13 @@ def setup_filter_settings_ui(self, window, font_family, font_size, font_color, w
     self.category_list.setSelectionMode(qtw.QAbstractItemView.ExtendedSelection)
     layout.addWidget(self.category_list)
 
+    # No selection means entries from every category are shown.
     categories = self.rss_feed_reader.get_categories()
     self.category_list.addItems(categories)
+    selected = set(self.filters.get("categories") or [])
+    for row in range(self.category_list.count()):
+        item = self.category_list.item(row)
+        item.setSelected(item.text() in selected)
 
     sort_label = qtw.QLabel("Sort By:", window)
     sort_label.setStyleSheet(f"color: {font_color}; font: {font_style};")
@@ -127,12 +156,12 @@ def save_filter_sort_settings(self):
     filters_path = os.path.join(settings_folder, "filters.json")
     sorting_path = os.path.join(settings_folder, "sorting.json")
 
-    keywords = self.keyword_entry.text().strip().split(",")
+    keywords = [keyword.strip() for keyword in self.keyword_entry.text().split(",") if keyword.strip()]
 
-    start_date = self.start_date_edit.date().toString("yyyy-MM-dd")
-    end_date = self.end_date_edit.date().toString("yyyy-MM-dd")
+    start_date = _date_setting(self.start_date_edit)
+    end_date = _date_setting(self.end_date_edit)
 
-    selected_categories = [item.text() for item in self.category_list.selectedItems()]
+    selected_categories = [item.text() for item in self.category_list.selectedItems()] or None
 
     self.filters.update({
         "keywords": keywords,
@@ -151,4 +180,5 @@ def save_filter_sort_settings(self):
     with open(sorting_path, "w") as f:
         json.dump(self.sorting, f, indent=4)
 
-    self.refresh_feeds()
\ No newline at end of file
+    self.rss_feed_reader.set_filters(self.filters)
+    self.apply_filters()
\ No newline at end of file
@@ -3,6 +3,7 @@
 from PySide6 import QtWidgets as qtw
 import configparser
 import os
+from modules.settings.feed_config import read_feed_settings
 from modules.tooltip import ToolTip
 from modules.logging.logger import setup_logger
 
@@ -11,14 +12,10 @@ logger = setup_logger('settings')
 def load_settings(self):
     """Loads settings from the config.ini file."""
     logger.info("Loading settings from config.ini...")
-    settings_folder = os.path.join("modules", "settings")
-    config_path = os.path.join(settings_folder, "config.ini")
-    config = configparser.ConfigParser()
-    config.read(config_path)
-
-    self.entries_per_feed = config.getint("FeedSettings", "entries_per_feed", fallback=10)
-    self.refresh_interval_mins = config.getint("FeedSettings", "refresh_interval_mins", fallback=30)
-    self.display_format = config.get("FeedSettings", "display_format", fallback="Simple List")
+    feed_settings = read_feed_settings()
+    self.entries_per_feed = feed_settings['entries_per_feed']
+    self.refresh_interval_mins = feed_settings['refresh_interval_mins']
+    self.display_format = feed_settings['display_format']
 
 def load_config(self):
     logger.info("Loading configuration from config.ini...")
@@ -117,5 +114,7 @@ def save_settings(self, entries_per_feed, refresh_interval_mins, display_format)
     self.entries_per_feed = entries_per_feed
     self.refresh_interval_mins = refresh_interval_mins
     self.display_format = display_format
+    self.rss_feed_reader.set_refresh_interval(refresh_interval_mins)
+    self.rss_feed_reader.set_entries_per_feed(entries_per_feed)
 
     self.refresh_feeds()
\ No newline at end of file
@@ -0,0 +1,79 @@
+# tests/test_entry_dedup.py
+
+from modules.entry_dedup import DuplicateIndex
+from modules.feed_store import FeedStore
+
+TITLE = "Storm knocks out power to thousands across the region, officials say"
+
+def _entry(feed, guid, title, link=None):
+    return {'feed': feed, 'id': guid, 'title': title, 'link': link or f"{feed}/{guid}", 'summary': ''}
+
+def _groups(entries):
+    index = DuplicateIndex(FeedStore(':memory:'))
+    for entry in entries:
+        index.assign_entries([entry])
+    return [entry['dup_group'] for entry in entries]
+
+def test_one_word_title_variants_are_grouped():
+    variants = [
+        "A storm knocks out power to thousands across the region, officials say",
+        "Storm knocks out power to thousands across the region, authorities say",
+        "Storm knocks out power to thousands across the region, officials say now",
+    ]
+    for number, variant in enumerate(variants):
+        original, copy = _groups([_entry('http://a.example/feed', '1', TITLE),
+                                  _entry('http://b.example/feed', str(number), variant)])
+        assert original == copy, variant
+
+def test_unrelated_titles_are_not_grouped():
+    first, second = _groups([_entry('http://a.example/feed', '1', TITLE),
+                             _entry('http://b.example/feed', '1', "Local team wins the championship after extra time")])
+    assert first != second
+
+def test_guids_match_only_within_their_feed():
+    # Both feeds number their entries from 1; only the link or the text may join them.
+    first, second, again = _groups([_entry('http://a.example/feed', '1', "Quarterly results beat analyst expectations"),
+                                    _entry('http://b.example/feed', '1', "New species of frog found in rainforest survey"),
+                                    _entry('http://b.example/feed', '1', "New species of frog found in rainforest survey")])
+    assert first != second
+    assert second == again
+
+def test_links_match_across_feeds_and_batches():
+    index = DuplicateIndex(FeedStore(':memory:'))
+    batch = [_entry('http://a.example/feed', 'x', "Short", 'https://www.news.example/story?utm_source=a'),
+             _entry('http://b.example/feed', 'y', "Other", 'http://news.example/story/')]
+    assert index.assign_entries(batch) == 1
+    later = _entry('http://c.example/feed', 'z', "Third", 'https://news.example/story#top')
+    assert index.assign_entries([later]) == 1
+    assert batch[0]['dup_group'] == batch[1]['dup_group'] == later['dup_group']
+
+def test_stored_groups_are_indexed_on_first_use():
+    store = FeedStore(':memory:')
+    entry = _entry('http://a.example/feed', '1', TITLE)
+    DuplicateIndex(store).assign_entries([entry])
+    store.upsert_entries('http://a.example/feed', [entry])
+    store.conn.execute("DELETE FROM dedup_entries")
+    store.set_metadata('dedup_index', None)
+    copy = _entry('http://b.example/feed', '1', TITLE.replace('officials', 'authorities'))
+    assert DuplicateIndex(store).assign_entries([copy]) == 1
+    assert copy['dup_group'] == entry['dup_group']
+
+def _briefings(feed, count=5):
+    return [_entry(feed, str(day), f"Daily market briefing for March {day}: stocks, bonds and currencies")
+            for day in range(1, count + 1)]
+
+def test_templated_titles_in_one_feed_stay_separate():
+    index = DuplicateIndex(FeedStore(':memory:'))
+    batch = _briefings('http://a.example/feed')
+    assert index.assign_entries(batch) == 0
+    later = _entry('http://a.example/feed', '6', "Daily market briefing for March 6: stocks, bonds and currencies")
+    assert index.assign_entries([later]) == 0
+    assert len({entry['dup_group'] for entry in batch + [later]}) == 6
+
+def test_group_takes_one_entry_per_feed():
+    index = DuplicateIndex(FeedStore(':memory:'))
+    index.assign_entries(_briefings('http://a.example/feed'))
+    copies = _briefings('http://b.example/feed')
+    index.assign_entries(copies)
+    groups = [entry['dup_group'] for entry in copies]
+    assert len(set(groups)) == len(groups)
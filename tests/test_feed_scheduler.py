@@ -0,0 +1,35 @@
+# tests/test_feed_scheduler.py
+
+import time
+from email.utils import formatdate
+from modules.feed_entry import from_parsed
+from modules.feed_scheduler import FeedScheduler, publish_cadence
+
+HOUR = 3600
+
+def _hourly(count=10):
+    now = time.time() // HOUR * HOUR
+    return [now - HOUR * i for i in range(count)]
+
+def test_cadence_from_feed_entries():
+    # The cache and both record_fetch calls in get_feed_entries hand over FeedEntry objects.
+    entries = [from_parsed({'title': f"t{i}", 'link': f"http://example.com/{i}", 'published_parsed': time.gmtime(epoch)},
+                           'http://example.com/feed', time.time())
+               for i, epoch in enumerate(_hourly())]
+    assert publish_cadence(entries) == HOUR
+
+def test_cadence_from_stream_parsed_dicts():
+    # FeedStream yields plain dicts carrying only the published string.
+    entries = [{'published': formatdate(epoch, usegmt=True)} for epoch in _hourly()]
+    assert publish_cadence(entries) == HOUR
+
+def test_cadence_from_feedparser_entries():
+    entries = [{'published_parsed': time.gmtime(epoch)} for epoch in _hourly()]
+    assert publish_cadence(entries) == HOUR
+
+def test_record_fetch_adapts_interval():
+    scheduler = FeedScheduler(base_interval_secs=1800, min_interval_secs=60, jitter=0)
+    entries = [from_parsed({'title': f"t{i}", 'published_parsed': time.gmtime(epoch)}, 'http://example.com/feed', time.time())
+               for i, epoch in enumerate(_hourly())]
+    scheduler.record_fetch('http://example.com/feed', entries)
+    assert scheduler.intervals['http://example.com/feed'] == HOUR / 2
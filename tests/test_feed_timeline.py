@@ -0,0 +1,33 @@
+# tests/test_feed_timeline.py
+
+import random
+from modules.entry_sorting import SortedEntries
+from modules.feed_entry import from_parsed
+from modules.feed_timeline import merge_timeline
+
+def _feed(feed_url, count, rng, fetched_at):
+    entries = []
+    for i in range(count):
+        entry = {'link': f"{feed_url}/{i}"}
+        # Undated entries all get the fetch time and untitled ones share an
+        # empty title, so (date, title) ties are common.
+        if rng.random() < 0.5:
+            entry['published'] = f"Mon, 01 Jan 2024 0{rng.randrange(3)}:00:00 GMT"
+        if rng.random() < 0.5:
+            entry['title'] = rng.choice(['a', 'b'])
+        entries.append(from_parsed(entry, feed_url, fetched_at))
+    return SortedEntries(entries).by_date
+
+def test_paging_visits_every_entry_once():
+    rng = random.Random(7)
+    for _ in range(20):
+        streams = {f"http://example.com/{feed}": _feed(f"http://example.com/{feed}", rng.randrange(30), rng, 1e9)
+                   for feed in range(7)}
+        seen, cursor = [], None
+        while True:
+            page = merge_timeline(streams, limit=7, cursor=cursor)
+            seen.extend(entry.link for _, entry in page)
+            cursor = page.cursor
+            if cursor is None:
+                break
+        assert sorted(seen) == sorted(entry.link for ordered in streams.values() for entry in ordered)
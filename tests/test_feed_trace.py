@@ -0,0 +1,31 @@
+# tests/test_feed_trace.py
+
+import pstats
+from concurrent.futures import ThreadPoolExecutor
+from modules.feed_trace import RefreshProfiler, profiled
+
+def pooled_work(n):
+    return sum(i * i for i in range(n))
+
+def _function_names(path):
+    return {name for _, _, name in pstats.Stats(str(path)).stats}
+
+def test_cycle_profiles_pooled_tasks(tmp_path):
+    path = tmp_path / 'refresh.prof'
+    profiler = RefreshProfiler(str(path))
+    with profiler.cycle():
+        task = profiled(pooled_work)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            assert list(executor.map(task, [10_000, 20_000])) == [pooled_work(10_000), pooled_work(20_000)]
+    assert profiler.cycles == 1
+    assert 'pooled_work' in _function_names(path)
+    # Outside a cycle tasks run unwrapped.
+    assert profiled(pooled_work) is pooled_work
+
+def test_overlapping_cycles_still_run(tmp_path):
+    outer = RefreshProfiler(str(tmp_path / 'outer.prof'))
+    inner = RefreshProfiler(str(tmp_path / 'inner.prof'))
+    with outer.cycle():
+        with inner.cycle():
+            assert pooled_work(10) == 285
+    assert outer.cycles == 1
@@ -0,0 +1,68 @@
+# tests/test_filter_sort_settings.py
+
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+qtw = pytest.importorskip('PySide6.QtWidgets')
+
+from modules.feed_entry import from_parsed
+from modules.rss_feed_reader import RSSFeedReader
+from modules.settings import filter_sort_settings
+
+FEED_URL = 'http://example.com/feed'
+DAY = 86400
+
+@pytest.fixture
+def owner(tmp_path, monkeypatch):
+    # save_filter_sort_settings writes modules/settings/*.json relative to the working directory.
+    (tmp_path / 'modules' / 'settings').mkdir(parents=True)
+    monkeypatch.chdir(tmp_path)
+    qtw.QApplication.instance() or qtw.QApplication([])
+    reader = RSSFeedReader(metrics=False)
+    reader.add_feed(FEED_URL, 'News')
+    reader.add_feed('http://example.com/other', 'Sports')
+    now = time.time()
+    entries = [from_parsed({'title': f"Story {i}", 'summary': 'markets' if i % 2 else 'weather',
+                            'published_parsed': time.gmtime(now - DAY * i * 3)}, FEED_URL, now)
+               for i in range(10)]
+    owner = SimpleNamespace(rss_feed_reader=reader, sorting={'method': 'date', 'order': 'descending'})
+    owner.view = reader.get_filtered_view(FEED_URL, entries)
+    owner.apply_filters = lambda: owner.view.apply(reader.entry_filter)
+    return owner
+
+def _save_unchanged(owner, filters):
+    owner.filters = filters
+    owner.rss_feed_reader.set_filters(filters)
+    before = owner.view.apply(owner.rss_feed_reader.entry_filter)
+    owner.dialog = qtw.QDialog()
+    filter_sort_settings.setup_filter_settings_ui(owner, owner.dialog, 'Arial', 1, 'black', 'white', 'white', 'white')
+    filter_sort_settings.save_filter_sort_settings(owner)
+    return before, owner.view.visible
+
+def test_unchanged_save_keeps_unfiltered_entries(owner):
+    before, after = _save_unchanged(owner, {'keywords': [], 'date_range': {'start': None, 'end': None}, 'categories': None})
+    assert len(after) == 10
+    assert after == before
+    assert owner.filters == {'keywords': [], 'date_range': {'start': None, 'end': None}, 'categories': None}
+
+def test_unchanged_save_keeps_active_filter(owner):
+    start = time.strftime('%Y-%m-%d', time.localtime(time.time() - DAY * 13))
+    before, after = _save_unchanged(owner, {'keywords': ['markets'], 'date_range': {'start': start, 'end': None},
+                                            'categories': ['News']})
+    assert 0 < len(after) < 10
+    assert after == before
+
+def test_shipped_filters_show_everything():
+    path = os.path.join(os.path.dirname(filter_sort_settings.__file__), 'filters.json')
+    owner = SimpleNamespace()
+    cwd = os.getcwd()
+    os.chdir(os.path.dirname(os.path.dirname(os.path.dirname(path))))
+    try:
+        filter_sort_settings.load_filter_sort_settings(owner)
+    finally:
+        os.chdir(cwd)
+    assert RSSFeedReader(metrics=False).set_filters(owner.filters).is_empty()
@@ -0,0 +1,123 @@
+# tests/test_rss_feed_reader.py
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from modules.feed_store import FeedStore
+from modules.rss_feed_reader import CancelToken, FetchCancelled, RSSFeedReader
+
+def test_only_enabled_feeds_are_scheduled():
+    reader = RSSFeedReader()
+    reader.add_feed('http://example.com/a', 'news')
+    reader.add_feed('http://example.com/b', 'news')
+    reader.update_feed('http://example.com/a', enabled=False)
+    assert 'http://example.com/a' not in reader.scheduler
+    assert reader.scheduler.pop_due(now=1e12) == ['http://example.com/b']
+    reader.update_feeds(['http://example.com/a'], enabled=True)
+    assert 'http://example.com/a' in reader.scheduler
+
+@pytest.fixture
+def stalling_server():
+    # Sends the headers and the first item, then stalls until the test ends.
+    release = threading.Event()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/rss+xml; charset=utf-8')
+            self.end_headers()
+            self.wfile.write(b'<rss><channel><item><title>First</title><guid>1</guid></item>')
+            self.wfile.flush()
+            release.wait(20)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    release.set()
+    server.shutdown()
+    server.server_close()
+
+def _cancel_after(token, secs):
+    timer = threading.Timer(secs, token.cancel)
+    timer.start()
+    return timer
+
+def test_cancel_aborts_a_stalled_fetch(stalling_server):
+    reader = RSSFeedReader(metrics=False)
+    feed_url = f"{stalling_server}/feed"
+    reader.add_feed(feed_url, 'news')
+    token = CancelToken()
+    _cancel_after(token, 0.3)
+    started = time.perf_counter()
+    with pytest.raises(FetchCancelled):
+        reader.get_feed_entries(feed_url, force_refresh=True, cancel=token)
+    assert time.perf_counter() - started < 5
+    # The partial body is neither cached nor counted as a failure.
+    assert reader.entry_cache.get(feed_url) is None
+    assert reader.scheduler._failures.get(feed_url) is None
+
+def test_cancel_stops_a_refresh_submitting_more_work(stalling_server):
+    reader = RSSFeedReader(metrics=False)
+    feed_urls = [f"{stalling_server}/{n}" for n in range(6)]
+    for feed_url in feed_urls:
+        reader.add_feed(feed_url, 'news')
+    token = CancelToken()
+    _cancel_after(token, 0.3)
+    started = time.perf_counter()
+    results = reader.refresh_all_feeds(max_workers=2, max_per_host=2, cancel=token)
+    assert time.perf_counter() - started < 5
+    assert len(results) == 2
+    assert all(isinstance(result.error, FetchCancelled) for result in results.values())
+
+@pytest.fixture
+def rotating_etag_server():
+    # Answers 304 to the current ETag and hands out the next one with it.
+    state = {'etag': 1, 'requests': []}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            sent = self.headers.get('If-None-Match')
+            state['requests'].append(sent)
+            if sent == f'"v{state["etag"]}"':
+                state['etag'] += 1
+                self.send_response(304)
+                self.send_header('ETag', f'"v{state["etag"]}"')
+                self.end_headers()
+                return
+            body = b'<rss><channel><item><title>First</title><guid>1</guid></item></channel></rss>'
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/rss+xml; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', f'"v{state["etag"]}"')
+            self.send_header('Last-Modified', 'Mon, 01 Jan 2024 00:00:00 GMT')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/feed", state
+    server.shutdown()
+    server.server_close()
+
+def test_not_modified_updates_and_saves_validators(rotating_etag_server):
+    feed_url, state = rotating_etag_server
+    store = FeedStore(':memory:')
+    reader = RSSFeedReader(store=store, metrics=False)
+    reader.add_feed(feed_url, 'news')
+    for _ in range(3):
+        assert [entry.title for entry in reader.get_feed_entries(feed_url, force_refresh=True)] == ['First']
+    assert state['requests'] == [None, '"v1"', '"v2"']
+    feed = reader.get_feed(feed_url)
+    assert (feed.etag, feed.last_modified) == ('"v3"', 'Mon, 01 Jan 2024 00:00:00 GMT')
+    assert store.load_feeds()[0]['etag'] == '"v3"'